@@ -1,5 +1,7 @@
 import pygame
 from typing import Optional, Set, Tuple
+from bboard import pin_ids
+from fonts import render_text
 
 class LED:
     COLORS = {
@@ -14,6 +16,7 @@ class LED:
         self.radius = 10
         self.anode_pos = (x, y - 15)    # Positive terminal (longer leg)
         self.cathode_pos = (x, y + 15)  # Negative terminal (shorter leg)
+        self.pin_ids = None  # Point IDs of the terminals, looked up in draw once placed
         self.is_on = False
 
     def update_position(self, x: int, y: int):
@@ -21,14 +24,18 @@ class LED:
         self.y = y
         self.anode_pos = (x, y - 15)
         self.cathode_pos = (x, y + 15)
+        self.pin_ids = None
 
     def check_power_state(self, powered_points: Set[Tuple[int, int]], 
                          grounded_points: Set[Tuple[int, int]], 
                          vcc_pos: Tuple[int, int], 
                          gnd_pos: Tuple[int, int]) -> bool:
         """Returns True if LED should be lit (anode connected to VCC and cathode to GND)"""
-        anode_powered = self.anode_pos in powered_points or self.anode_pos == vcc_pos
-        cathode_grounded = self.cathode_pos in grounded_points or self.cathode_pos == gnd_pos
+        if self.pin_ids is None:
+            self.pin_ids = pin_ids(self, ['anode', 'cathode'])
+        ids = self.pin_ids or {}
+        anode_powered = ('anode' in ids and powered_points.has_id(ids['anode'])) or self.anode_pos == vcc_pos
+        cathode_grounded = ('cathode' in ids and grounded_points.has_id(ids['cathode'])) or self.cathode_pos == gnd_pos
         return anode_powered and cathode_grounded
 
     def draw(self, window, powered_points: Set[Tuple[int, int]], 
@@ -56,9 +63,8 @@ class LED:
         pygame.draw.circle(window, self.COLORS['border'], self.cathode_pos, 4)
         
         # Draw + and - labels
-        font = pygame.font.Font(None, 20)
-        plus_text = font.render('+', True, self.COLORS['border'])
-        minus_text = font.render('-', True, self.COLORS['border'])
+        plus_text = render_text('+', 20, self.COLORS['border'])
+        minus_text = render_text('-', 20, self.COLORS['border'])
         window.blit(plus_text, (self.x + 8, self.y - 20))
         window.blit(minus_text, (self.x + 8, self.y + 10))
 
@@ -93,8 +99,7 @@ class LEDPalette:
         pygame.draw.rect(window, (200, 200, 200), self.button_rect)
         pygame.draw.rect(window, (100, 100, 100), self.button_rect, 2)
         
-        font = pygame.font.Font(None, 24)
-        text = font.render("LED", True, (0, 0, 0))
+        text = render_text("LED", 24, (0, 0, 0))
         text_rect = text.get_rect(center=self.button_rect.center)
         window.blit(text, text_rect)
 
@@ -1,96 +1,21 @@
 import pygame
 from typing import Optional, Set, Tuple
-
-# Constants
-GRID_X1 = 225
-GRID_X2 = 794
-GRID_X2E = 790
-GRID_X3 = 1383
-GRID_Y1 = 288
-GRID_Y2 = 373
-GRID_Y3 = GRID_Y1 + 143
-GRID_Y4 = GRID_Y2 + 143
-
-X1_RAIL = 225
-X2_RAIL = 308
-X3_RAIL = 833
-X4_RAIL = 926
-Y1_UP_RAIL = 207    # Top positive rail
-Y2_UP_RAIL = 233    # Top negative rail
-Y1_DOWN_RAIL = 566  # Bottom positive rail
-Y2_DOWN_RAIL = 592  # Bottom negative rail
-cell_size = 19.5
-
-def get_vertical_group_points(x, y):
-    """Get all points in the same vertical column within the same half"""
-    points = set()
-    
-    # Check which half we're in based on y coordinate
-    if GRID_Y1 <= y <= GRID_Y2:  # Upper half
-        # LEFT UPPER HALF
-        if GRID_X1 <= x <= GRID_X2:
-            for grid_y in range(GRID_Y1, GRID_Y2 + 1, int(cell_size)):
-                points.add((x, grid_y))
-        
-        # RIGHT UPPER HALF
-        if GRID_X2E <= x <= GRID_X3:
-            for grid_y in range(GRID_Y1, GRID_Y2 + 1, int(cell_size)):
-                points.add((x, grid_y))
-                
-    elif GRID_Y3 <= y <= GRID_Y4:  # Lower half
-        # LEFT LOWER HALF
-        if GRID_X1 <= x <= GRID_X2:
-            for grid_y in range(GRID_Y3, GRID_Y4 + 1, int(cell_size)):
-                points.add((x, grid_y))
-                
-        # RIGHT LOWER HALF
-        if GRID_X2E <= x <= GRID_X3:
-            for grid_y in range(GRID_Y3, GRID_Y4 + 1, int(cell_size)):
-                points.add((x, grid_y))
-            
-    return points
-
-def get_rail_type(y):
-    """Get the type of rail based on y-coordinate"""
-    if y == Y1_UP_RAIL:
-        return 'top_pos'
-    elif y == Y2_UP_RAIL:
-        return 'top_neg'
-    elif y == Y1_DOWN_RAIL:
-        return 'bottom_pos'
-    elif y == Y2_DOWN_RAIL:
-        return 'bottom_neg'
-    return None
-
-def get_rail_points(x, y):
-    """Get all points in the same power rail"""
-    points = set()
-    if is_power_rail(x, y):
-        rail_y = y  # Keep track of which rail we're on
-        # Power the entire rail line for this y-coordinate
-        for i in range(5):
-            k = 116 * i
-            # Left side rails
-            for rx in range(X1_RAIL + k, X2_RAIL + k + 1, int(cell_size)):
-                points.add((rx, rail_y))
-            # Right side rails
-            for rx in range(X3_RAIL + k, X4_RAIL + k + 1, int(cell_size)):
-                points.add((rx, rail_y))
-    return points
-
-def is_power_rail(x, y):
-    """Check if a point is on a power rail"""
-    in_rail_x = (X1_RAIL <= x <= X4_RAIL + 116*5)
-    in_rail_y = y in [Y1_UP_RAIL, Y2_UP_RAIL, Y1_DOWN_RAIL, Y2_DOWN_RAIL]
-    return in_rail_x and in_rail_y
+from bboard import level_of_id, pin_ids
+from fonts import render_text
+from snap import draw_snap_preview, snap_pins
+from geometry import GRID_Y2, GRID_Y4
 
 
 class NandGate:
+    kind = 'NAND'  # Logic used by the compiled gate network
+
     COLORS = {
         'body': (100, 100, 100),  # Gray for gate body
         'powered': (0, 255, 0),   # Green for powered state
         'unpowered': (255, 0, 0), # Red for unpowered state
-        'border': (0, 0, 0)       # Black for borders
+        'border': (0, 0, 0),      # Black for borders
+        'unknown': (255, 128, 0), # Orange for X (driven both ways)
+        'floating': (160, 160, 160)  # Grey for Z (not driven)
     }
 
     def __init__(self, x: int, y: int):
@@ -114,10 +39,8 @@ class NandGate:
         """Update the position of the AND gate while maintaining constraints"""
         self.x = x
         
-        # Constrain y position to middle section (between GRID_Y2 and GRID_Y3)
-        GRID_Y2 = 373  # Upper grid end
-        GRID_Y3 = GRID_Y2 + 143  # Lower grid start
-        middle_y = GRID_Y2 + (GRID_Y3 - GRID_Y2) // 2
+        # Constrain y position to middle section (between GRID_Y2 and GRID_Y4)
+        middle_y = GRID_Y2 + (GRID_Y4 - GRID_Y2) // 2
         
         # Allow some movement up and down within the middle section
         max_offset = 40  # Maximum distance from middle
@@ -130,59 +53,38 @@ class NandGate:
         self.output_pos = (x + 20, self.y)    # Right middle
         self.gnd_pos = (x + 40, self.y)       # Rightmost
 
+        # Point IDs of the pins, looked up again in draw once the moved gate is placed
+        self.pin_ids = None
 
-    def check_power_state(self, powered_points: Set[Tuple[int, int]], 
-                         grounded_points: Set[Tuple[int, int]], 
-                         vcc_pos: Tuple[int, int], 
-                         gnd_pos: Tuple[int, int]) -> bool:
-        """Simplified power check - returns True if AND condition is met"""
-        # Check if inputs are powered
-        input1_powered = self.input1_connection in powered_points if self.input1_connection else False
-        input2_powered = self.input2_connection in powered_points if self.input2_connection else False
-        
-        # Check if VCC and GND are connected
-        has_power = self.vcc_connection in powered_points
-        has_ground = self.gnd_connection in grounded_points
-
-        # Basic AND logic
-        output_powered = not(input1_powered and input2_powered) and has_power and has_ground
-        
-        # If output is powered, also add inputs and output to powered points
-        if output_powered:
-            if self.input1_connection:
-                powered_points.add(self.input1_connection)
-            if self.input2_connection:
-                powered_points.add(self.input2_connection)
-            if self.output_connection:
-                powered_points.add(self.output_connection)
-
-        return output_powered
-    
 
     def draw(self, window: pygame.Surface, powered_points: Set[Tuple[int, int]], 
             grounded_points: Set[Tuple[int, int]], 
             vcc_pos: Tuple[int, int], 
             gnd_pos: Tuple[int, int]):
-        # Get output state
-        output_powered = self.check_power_state(powered_points, grounded_points, vcc_pos, gnd_pos)
+        # Pin point IDs are looked up once the gate is on the board; none while dragged
+        if self.pin_ids is None:
+            self.pin_ids = pin_ids(self)
+        ids = self.pin_ids or {}
+
+        # Output state comes from the last simulation update
+        output_powered = 'output' in ids and powered_points.has_id(ids['output'])
 
         # Draw gate body (horizontal line)
         pygame.draw.line(window, self.COLORS['body'], 
                         (self.x - 50, self.y), 
                         (self.x + 50, self.y), 4)
         
-                # Draw gate label
-        font = pygame.font.Font(None, 24)
-        text = font.render("NAND", True, self.COLORS['border'])
+        # Draw gate label
+        text = render_text("NAND", 24, self.COLORS['border'])
         text_rect = text.get_rect(center=(self.x, self.y - 15))
         window.blit(text, text_rect)
 
         # Draw pins and connections with simplified coloring
         pin_states = {
-            'vcc': self.vcc_connection in powered_points,
-            'gnd': self.gnd_connection in grounded_points,
-            'input1': self.input1_connection in powered_points,
-            'input2': self.input2_connection in powered_points,
+            'vcc': 'vcc' in ids and powered_points.has_id(ids['vcc']),
+            'gnd': 'gnd' in ids and grounded_points.has_id(ids['gnd']),
+            'input1': 'input1' in ids and powered_points.has_id(ids['input1']),
+            'input2': 'input2' in ids and powered_points.has_id(ids['input2']),
             'output': output_powered
         }
 
@@ -191,14 +93,19 @@ class NandGate:
             pin_pos = getattr(self, f"{pin_name}_pos")
             connection = getattr(self, f"{pin_name}_connection")
             
-            color = self.COLORS['powered'] if is_powered else self.COLORS['unpowered']
+            level = level_of_id(ids.get(pin_name))
+            if level == 'X':
+                color = self.COLORS['unknown']
+            elif level == 'Z':
+                color = self.COLORS['floating']
+            else:
+                color = self.COLORS['powered'] if is_powered else self.COLORS['unpowered']
             pygame.draw.circle(window, color, pin_pos, 4)
             
             if connection:
                 pygame.draw.line(window, color, pin_pos, connection, 2)
 
         # Draw labels above the pins
-        font = pygame.font.Font(None, 16)
         labels = [
             ("VCC", self.vcc_pos),
             ("IN1", self.input1_pos),
@@ -207,7 +114,7 @@ class NandGate:
             ("GND", self.gnd_pos)
         ]
         for text, pos in labels:
-            surface = font.render(text, True, self.COLORS['border'])
+            surface = render_text(text, 16, self.COLORS['border'])
             rect = surface.get_rect(center=(pos[0], pos[1] - 15))
             window.blit(surface, rect)
 
@@ -218,7 +125,7 @@ class DraggableNandGate:
 
     def update_position(self, x: int, y: int):
         # Constrain y position to middle section
-        y = max(373, min(373 + 143, y))  # Constrain between GRID_Y2 and GRID_Y3
+        y = max(GRID_Y2, min(GRID_Y4, y))  # Constrain between GRID_Y2 and GRID_Y4
         self.gate.update_position(x, y)
 
     def draw(self, window: pygame.Surface, powered_points: Set[Tuple[int, int]], 
@@ -228,6 +135,8 @@ class DraggableNandGate:
         self.gate.draw(window, powered_points, grounded_points, vcc_pos, gnd_pos)
 
 class NandGatePalette:
+    PIN_NAMES = ['vcc', 'input1', 'input2', 'output', 'gnd']
+
     def __init__(self, x: int, y: int):
         self.x = x
         self.y = y # Position below LED palette
@@ -235,6 +144,7 @@ class NandGatePalette:
         self.button_height = 40
         self.button_rect = pygame.Rect(self.x, self.y, self.button_width, self.button_height)
         self.dragging_gate: Optional[DraggableNandGate] = None
+        self.snap_preview = {}  # Pin name -> hole it would snap to if dropped now
 
     def draw(self, window: pygame.Surface, powered_points: Set[Tuple[int, int]], 
             grounded_points: Set[Tuple[int, int]], 
@@ -244,13 +154,13 @@ class NandGatePalette:
         pygame.draw.rect(window, (200, 200, 200), self.button_rect)
         pygame.draw.rect(window, (100, 100, 100), self.button_rect, 2)
         
-        font = pygame.font.Font(None, 24)
-        text = font.render("NAND", True, (0, 0, 0))
+        text = render_text("NAND", 24, (0, 0, 0))
         text_rect = text.get_rect(center=self.button_rect.center)
         window.blit(text, text_rect)
 
         # Draw dragging gate if exists
         if self.dragging_gate:
+            draw_snap_preview(window, self.snap_preview)
             self.dragging_gate.draw(window, powered_points, grounded_points, vcc_pos, gnd_pos)
 
     def handle_click(self, pos: tuple) -> bool:
@@ -263,18 +173,16 @@ class NandGatePalette:
     def handle_drag(self, pos: tuple):
         if self.dragging_gate:
             self.dragging_gate.update_position(pos[0], pos[1])
+            self.snap_preview = snap_pins(self.dragging_gate.gate, self.PIN_NAMES)
 
-    def handle_release(self, grid_points: list) -> Optional[NandGate]:
+    def handle_release(self) -> Optional[NandGate]:
         if self.dragging_gate:
             gate = self.dragging_gate.gate
-            # Find nearest grid points for all pins
-            for pin_name in ['vcc', 'input1', 'input2', 'output', 'gnd']:
-                pin_pos = getattr(gate, f"{pin_name}_pos")
-                # Find nearest grid point
-                nearest_point = min(grid_points, 
-                    key=lambda p: ((p[0] - pin_pos[0])**2 + (p[1] - pin_pos[1])**2)**0.5)
-                setattr(gate, f"{pin_name}_connection", nearest_point)
-            
+            # Connect every pin to its nearest hole
+            for pin_name, hole in snap_pins(gate, self.PIN_NAMES).items():
+                setattr(gate, f"{pin_name}_connection", hole)
+
             self.dragging_gate = None
+            self.snap_preview = {}
             return gate
         return None
\ No newline at end of file
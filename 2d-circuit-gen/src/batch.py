@@ -0,0 +1,57 @@
+# batch.py
+from typing import Iterable, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for batched simulation
+    np = None
+
+from simulator import Circuit, CompiledCircuit
+
+# Batched simulation: every stimulus column is packed into one int, so each
+# gate is a single bitwise op over all N vectors and the per-vector Python
+# overhead disappears. numpy does the packing and unpacking.
+
+
+def _pack(column) -> int:
+    """Bool column -> int whose bit r is column[r]"""
+    return int.from_bytes(np.packbits(column, bitorder='little').tobytes(), 'little')
+
+
+def _unpack(word: int, count: int):
+    """Inverse of _pack for a column of count rows"""
+    data = np.frombuffer(word.to_bytes((count + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(data, count=count, bitorder='little').astype(bool)
+
+
+def simulate_batch(circuit: Union[Circuit, CompiledCircuit], inputs,
+                   observe: Optional[Iterable[str]] = None):
+    """Evaluate N input vectors at once.
+
+    inputs is an array of shape (N, n_inputs), columns in the circuit's input
+    order; the result has shape (N, n_outputs) in output order, as bools.
+    With observe, only the cone of those outputs is evaluated and the result
+    has one column per observed output, still in the circuit's output order.
+    """
+    if np is None:
+        raise ImportError("simulate_batch requires numpy")
+    compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile()
+    stimulus = np.asarray(inputs).astype(bool)
+    input_names = list(compiled.input_nets)
+    if stimulus.ndim != 2 or stimulus.shape[1] != len(input_names):
+        raise ValueError(f"Expected inputs of shape (N, {len(input_names)}), got {stimulus.shape}")
+    if observe is not None:
+        compiled = compiled.slice(observe)
+
+    count = stimulus.shape[0]
+    result = np.zeros((count, len(compiled.output_nets)), dtype=bool)
+    if count == 0:
+        return result
+
+    ones = (1 << count) - 1
+    words = {name: _pack(stimulus[:, i]) for i, name in enumerate(input_names)
+             if name in compiled.input_nets}
+    values = compiled.evaluate(words, ones)
+    for j, net in enumerate(compiled.output_nets.values()):
+        result[:, j] = _unpack(values.get(net, 0) & ones, count)
+    return result
@@ -0,0 +1,94 @@
+# clocked.py
+import time
+from typing import Callable, Dict, Optional, Union
+
+from simulator import Circuit, CompiledCircuit
+
+# Cycle-based simulation of sequential circuits. One cycle drives the clock
+# input high, settles the combinational logic, drives it low and settles
+# again; gate outputs carry over between settles so latches and flip-flops
+# built from NAND/NOR gates hold their state.
+
+# With constant inputs the state sequence is eventually periodic; states are
+# remembered up to this many cycles to detect the period and skip ahead.
+MAX_TRACKED_STATES = 1 << 16
+
+
+class ClockedSimulator:
+    """Advances a circuit by whole clock cycles"""
+
+    def __init__(self, circuit: Union[Circuit, CompiledCircuit], clock: str = 'CLK'):
+        self.compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile()
+        if clock not in self.compiled.input_nets:
+            raise KeyError(f"Clock input '{clock}' is not an input of the circuit")
+        self.clock = clock
+        self.inputs: Dict[str, int] = {name: 0 for name in self.compiled.input_nets}
+        self.state = [0] * len(self.compiled.network.gates)
+        self.cycle = 0
+        self.values: Dict[int, int] = {}
+        self._settle()
+
+    def set_input(self, name: str, value: int):
+        if name not in self.inputs or name == self.clock:
+            raise KeyError(f"Unknown data input '{name}'")
+        self.inputs[name] = 1 if value else 0
+
+    def outputs(self) -> Dict[str, int]:
+        return {name: self.values.get(net, 0) for name, net in self.compiled.output_nets.items()}
+
+    def _settle(self):
+        self.values = self.compiled.evaluate(self.inputs, 1, self.state)
+
+    def step(self):
+        """One full clock cycle: rising edge, settle, falling edge, settle"""
+        self.inputs[self.clock] = 1
+        self._settle()
+        self.inputs[self.clock] = 0
+        self._settle()
+        self.cycle += 1
+
+    def run(self, cycles: int,
+            stimulus: Optional[Callable[[int], Dict[str, int]]] = None) -> Dict[str, float]:
+        """Advance cycles clock cycles and report the simulation rate.
+
+        stimulus(cycle) may return new data input values before each cycle.
+        Without it the inputs are constant, so once a state repeats the
+        remaining cycles are skipped a whole period at a time.
+
+        steps_per_second is the throughput of the cycles actually simulated;
+        effective_cycles_per_second also counts the skipped ones, so it says
+        how fast this run went rather than how fast the simulator is.
+        """
+        start = time.perf_counter()
+        seen: Optional[Dict[tuple, int]] = {} if stimulus is None else None
+        simulated = 0
+        remaining = cycles
+        while remaining > 0:
+            if seen is not None:
+                key = tuple(self.state)
+                if key in seen:
+                    period = simulated - seen[key]
+                    skipped = (remaining // period) * period
+                    self.cycle += skipped
+                    remaining -= skipped
+                    seen = None
+                    continue
+                if len(seen) < MAX_TRACKED_STATES:
+                    seen[key] = simulated
+                else:
+                    seen = None
+            if stimulus is not None:
+                for name, value in stimulus(self.cycle).items():
+                    self.set_input(name, value)
+            self.step()
+            simulated += 1
+            remaining -= 1
+        seconds = time.perf_counter() - start
+        return {
+            'cycles': cycles,
+            'simulated': simulated,
+            'skipped': cycles - simulated,
+            'seconds': seconds,
+            'steps_per_second': simulated / seconds if seconds > 0 else float('inf'),
+            'effective_cycles_per_second': cycles / seconds if seconds > 0 else float('inf'),
+        }
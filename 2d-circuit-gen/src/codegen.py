@@ -0,0 +1,140 @@
+# codegen.py
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Mapping, Union
+
+from netlist import MAX_FIXPOINT_ITERATIONS, warn_unsettled
+from simulator import Circuit, CompiledCircuit
+
+# Code-generated backend: a compiled circuit is turned into one straight-line
+# Python function (one local variable per net and per gate output), compiled
+# once and cached by a hash of the netlist it came from.
+
+# Same logic as netlist.GATE_LOGIC, as source text
+GATE_EXPRESSIONS = {
+    'AND': '{0} & {1}',
+    'OR': '{0} | {1}',
+    'NAND': '({0} & {1}) ^ ones',
+    'NOR': '({0} | {1}) ^ ones',
+    'NOT': '{0} ^ ones',
+}
+
+CACHE_SIZE = 128  # Generated functions kept before the least recently used is dropped
+
+_cache: 'OrderedDict[str, Callable]' = OrderedDict()
+
+
+def netlist_hash(compiled: CompiledCircuit) -> str:
+    """Hash of everything the generated code depends on"""
+    network = compiled.network
+    parts = [
+        ('vcc', compiled.vcc_net),
+        ('tied', tuple(sorted(compiled.tied_high))),
+        ('inputs', tuple(compiled.input_nets.values())),
+        ('outputs', tuple(compiled.output_nets.values())),
+        ('schedule', tuple(tuple(component) for component in network.schedule)),
+    ]
+    for gate in network.gates:
+        parts.append((gate.kind, gate.inputs, gate.output, gate.power, gate.grounded))
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def generate_source(compiled: CompiledCircuit, name: str = 'evaluate') -> str:
+    """Python source of a function taking one value per input and returning the outputs"""
+    network = compiled.network
+    gates = network.gates
+    input_args = [f"i{k}" for k in range(len(compiled.input_nets))]
+
+    # Initial drive of every net: VCC, tied-high nets and input sources, OR-ed like on the board
+    drive: Dict[int, List[str]] = {}
+    if compiled.vcc_net is not None:
+        drive.setdefault(compiled.vcc_net, []).append('ones')
+    for net in sorted(compiled.tied_high):
+        drive.setdefault(net, []).append('ones')
+    for arg, net in zip(input_args, compiled.input_nets.values()):
+        if net is not None:
+            drive.setdefault(net, []).append(arg)
+
+    nets = set(drive)
+    for gate in gates:
+        nets.update(gate.inputs)
+        nets.add(gate.output)
+        if gate.power is not None:
+            nets.add(gate.power)
+    nets.update(net for net in compiled.output_nets.values() if net is not None)
+
+    def initial(net: int) -> str:
+        return " | ".join(drive.get(net, ['0']))
+
+    def expression(gate_index: int) -> str:
+        gate = gates[gate_index]
+        if not gate.grounded:
+            return '0'
+        text = GATE_EXPRESSIONS[gate.kind].format(*[f"n{net}" for net in gate.inputs])
+        if gate.power is not None:
+            text = f"({text}) & n{gate.power}"
+        return text
+
+    lines = [f"def {name}({', '.join(input_args + ['ones=1'])}):"]
+    for net in sorted(nets):
+        lines.append(f"    n{net} = {initial(net)}")
+    cyclic = [component for component in network.schedule if network.is_cyclic(component)]
+    if cyclic:
+        for gate_index in range(len(gates)):
+            lines.append(f"    g{gate_index} = 0")
+
+    for component in network.schedule:
+        if not network.is_cyclic(component):
+            gate_index = component[0]
+            lines.append(f"    g{gate_index} = {expression(gate_index)}")
+            lines.append(f"    n{gates[gate_index].output} |= g{gate_index}")
+            continue
+        # Feedback loop: same relaxation as GateNetwork.evaluate
+        lines.append(f"    for _ in range({MAX_FIXPOINT_ITERATIONS}):")
+        lines.append("        changed = False")
+        for gate_index in component:
+            output = gates[gate_index].output
+            wired = " | ".join(drive.get(output, []) + [f"g{driver}" for driver in network.drivers[output]])
+            lines.append(f"        r = {expression(gate_index)}")
+            lines.append(f"        if r != g{gate_index}:")
+            lines.append(f"            g{gate_index} = r")
+            lines.append(f"            n{output} = {wired}")
+            lines.append("            changed = True")
+        lines.append("        if not changed:")
+        lines.append("            break")
+        lines.append("    else:")
+        lines.append("        warn_unsettled()")
+
+    outputs = [f"n{net}" if net is not None else '0' for net in compiled.output_nets.values()]
+    lines.append(f"    return ({', '.join(outputs)}{',' if len(outputs) == 1 else ''})")
+    return "\n".join(lines) + "\n"
+
+
+def generated_function(compiled: CompiledCircuit) -> Callable:
+    """Compile (or fetch from the cache) the generated function for a circuit"""
+    key = netlist_hash(compiled)
+    function = _cache.get(key)
+    if function is not None:
+        _cache.move_to_end(key)
+        return function
+    namespace: Dict[str, object] = {'warn_unsettled': warn_unsettled}
+    exec(compile(generate_source(compiled), f"<circuit {key[:12]}>", 'exec'), namespace)
+    function = namespace['evaluate']
+    _cache[key] = function
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return function
+
+
+class CodegenEvaluator:
+    """Drop-in for Simulator.run backed by a generated function"""
+
+    def __init__(self, circuit: Union[Circuit, CompiledCircuit]):
+        self.compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile()
+        self.input_names = list(self.compiled.input_nets)
+        self.output_names = list(self.compiled.output_nets)
+        self.function = generated_function(self.compiled)
+
+    def run(self, inputs: Mapping[str, int], ones: int = 1) -> Dict[str, int]:
+        values = self.function(*[inputs.get(name, 0) for name in self.input_names], ones=ones)
+        return dict(zip(self.output_names, values))
@@ -3,28 +3,7 @@ from typing import List, Tuple, Dict, Set
 import math
 import pygame
 from typing import Optional, Tuple
-
-# Constants
-cell_size = 19.5
-GRID_X1 = 225
-GRID_Y1 = 288
-GRID_X2 = 794
-GRID_X2E = 790
-GRID_X3 = 1383
-GRID_Y2 = 373
-X1_RAIL = 225
-X2_RAIL = 308
-X3_RAIL = 833
-X4_RAIL = 926
-Y1_UP_RAIL = 207
-Y2_UP_RAIL = 233
-Y1_DOWN_RAIL = 566
-Y2_DOWN_RAIL = 592
-GRID_Y3 = GRID_Y1 + 143  # Y coordinate for lower grid start
-GRID_Y4 = GRID_Y2 + 143  # Y coordinate for lower grid end
-GRID_Y5 = GRID_Y1 + (5 * cell_size)  # Row 5 y-coordinate
-GRID_Y6 = GRID_Y1 + (6 * cell_size)  # Row 6 y-coordinate
-WIRE_COLOR = (0, 255, 0)
+from fonts import render_text
 
 @dataclass
 class Pin:
@@ -65,7 +44,6 @@ class InputSwitch:
 
     def toggle(self):
         self.is_on = not self.is_on
-        print(self.is_on)
 
     def is_vcc(self):
         return self.is_on
@@ -77,12 +55,11 @@ class InputSwitch:
         pygame.draw.circle(window, self.COLORS['border'], (self.x, self.y), self.switch_radius, 2)
 
         # Draw labels
-        font = pygame.font.Font(None, 24)
-        text = font.render(f"Input {self.label}", True, self.COLORS['text'])
+        text = render_text(f"Input {self.label}", 24, self.COLORS['text'])
         text_rect = text.get_rect(center=(self.x, self.y - 25))
         window.blit(text, text_rect)
 
-        state_text = font.render(str(int(self.is_on)), True, self.COLORS['text'])
+        state_text = render_text(str(int(self.is_on)), 24, self.COLORS['text'])
         state_rect = state_text.get_rect(center=(self.x, self.y))
         window.blit(state_text, state_rect)
 
@@ -91,6 +68,33 @@ class InputSwitch:
         pygame.draw.circle(window, connection_color, self.output_pos, self.connection_radius)
         pygame.draw.circle(window, self.COLORS['border'], self.output_pos, self.connection_radius, 2)
         
+class ClockSource(InputSwitch):
+    """Input that toggles itself every half period; clicking starts or pauses it.
+
+    It starts paused, so a board that does not use the clock stays idle.
+    """
+
+    def __init__(self, x: int, y: int, label: str, period_ms: int = 1000):
+        super().__init__(x, y, label)
+        self.is_on = False
+        self.period_ms = period_ms
+        self.running = False
+        self.last_edge_ms = 0
+
+    def tick(self, now_ms: int) -> bool:
+        """Advance to now_ms; returns True if the clock output changed"""
+        if not self.running or now_ms - self.last_edge_ms < self.period_ms // 2:
+            return False
+        self.last_edge_ms = now_ms
+        self.is_on = not self.is_on
+        return True
+
+    def draw(self, window: pygame.Surface):
+        super().draw(window)
+        if not self.running:
+            pygame.draw.circle(window, self.COLORS['border'], (self.x, self.y), self.switch_radius + 4, 1)
+
+
 # Also update InputManager class:
 class InputManager:
     def __init__(self):
@@ -103,26 +107,34 @@ class InputManager:
             InputSwitch(base_x + i * spacing, base_y, chr(65 + i))  # Labels A, B, C, D
             for i in range(4)
         ]
+        self.clock = ClockSource(base_x + 4 * spacing, base_y, "CLK")
         
+    def sources(self) -> List[InputSwitch]:
+        """Every input that drives a point: the switches, then the clock"""
+        return self.switches + [self.clock]
+
     def handle_click(self, pos: Tuple[int, int]) -> bool:
         """Returns True if a switch was clicked"""
         for switch in self.switches:
             if switch.is_clicked(pos):
                 switch.is_on = not switch.is_on
                 return True
+        if self.clock.is_clicked(pos):
+            self.clock.running = not self.clock.running
+            return True
         return False
     
     def draw(self, window: pygame.Surface):
-        for switch in self.switches:
+        for switch in self.sources():
             switch.draw(window)
             
     def get_powered_points(self) -> Set[Tuple[int, int]]:
         """Returns the set of powered output points from the switches"""
-        return {switch.output_pos for switch in self.switches if switch.is_on}
+        return {switch.output_pos for switch in self.sources() if switch.is_on}
     
     def get_switch_at_pos(self, pos: Tuple[int, int]) -> Optional[InputSwitch]:
         """Returns the switch at the given position, if any"""
-        for switch in self.switches:
+        for switch in self.sources():
             # Use distance check instead of exact position
             if is_mouse_near_point(pos, switch.output_pos):
                 return switch
@@ -0,0 +1,107 @@
+# conftest.py
+import random
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from simulator import Circuit, GateSpec
+
+# Random circuits shared by the engine tests. Each one comes with a plain
+# Python model of what it computes, so every engine is checked against the
+# same independent reference rather than against each other.
+
+GATE_KINDS = ['AND', 'OR', 'NAND', 'NOR', 'NOT']
+REFERENCE_LOGIC = {
+    'AND': lambda a, b: a & b,
+    'OR': lambda a, b: a | b,
+    'NAND': lambda a, b: 1 - (a & b),
+    'NOR': lambda a, b: 1 - (a | b),
+    'NOT': lambda a: 1 - a,
+}
+RANDOM_CIRCUITS = 40
+
+
+class RandomCircuit:
+    """An acyclic circuit of GateSpecs with one driver per net.
+
+    Every gate input is wired to an input or to an earlier gate's output;
+    with constants, VCC and GND are possible sources too.
+    """
+
+    def __init__(self, seed: int, inputs: int = 4, gates: int = 12, outputs: int = 3,
+                 constants: bool = False):
+        rng = random.Random(seed)
+        if constants:
+            self.circuit = Circuit(('VCC',), ('GND',), breadboard=False, ideal_power=True)
+        else:
+            self.circuit = Circuit(breadboard=False, ideal_power=True)
+        self.input_names = [f"IN{i+1}" for i in range(inputs)]
+        # Signal points in creation order; a signal's value is the input, constant or gate driving it
+        self.points: List[tuple] = []
+        self.drivers: List[Tuple[str, object]] = []
+        for name in self.input_names:
+            self.points.append(('switch', name))
+            self.drivers.append(('input', name))
+            self.circuit.add_input(name, ('switch', name))
+        if constants:
+            self.points += [('VCC',), ('GND',)]
+            self.drivers += [('constant', 1), ('constant', 0)]
+
+        # (kind, signal index per input pin), indexed like circuit.gates
+        self.gates: List[Tuple[str, List[int]]] = []
+        for g in range(gates):
+            kind = rng.choice(GATE_KINDS)
+            gate = self.circuit.add_gate(GateSpec(kind, f"{kind}{g+1}"))
+            picks = [rng.randrange(len(self.points)) for _ in range(1 if kind == 'NOT' else 2)]
+            for pin_name, signal in zip(('input1', 'input2'), picks):
+                self.circuit.add_wire(self.points[signal], getattr(gate, f"{pin_name}_pos"))
+            self.gates.append((kind, picks))
+            self.points.append(gate.output_pos)
+            self.drivers.append(('gate', g))
+
+        first_gate = len(self.points) - gates
+        self.outputs = rng.sample(range(first_gate, len(self.points)), min(outputs, gates))
+        self.output_names = []
+        for i, signal in enumerate(self.outputs):
+            name = f"OUT{i+1}"
+            self.output_names.append(name)
+            self.circuit.add_output(name, ('output', name))
+            self.circuit.add_wire(self.points[signal], ('output', name))
+
+    def reference(self, inputs: Dict[str, int],
+                  fault: Optional[Tuple[int, str, int]] = None) -> Dict[str, int]:
+        """Output values for one input assignment, with an optional (gate, pin, value) stuck-at fault"""
+        values = []
+        for driver, source in self.drivers:
+            if driver == 'input':
+                values.append(inputs.get(source, 0))
+            elif driver == 'constant':
+                values.append(source)
+            else:
+                kind, picks = self.gates[source]
+                pins = [values[signal] for signal in picks]
+                for k in range(len(pins)):
+                    if fault is not None and fault[:2] == (source, f"input{k+1}"):
+                        pins[k] = fault[2]
+                value = REFERENCE_LOGIC[kind](*pins)
+                if fault is not None and fault[:2] == (source, 'output'):
+                    value = fault[2]
+                values.append(value)
+        return {name: values[signal] for name, signal in zip(self.output_names, self.outputs)}
+
+    def rows(self):
+        """Every input assignment, first input as the most significant bit"""
+        count = len(self.input_names)
+        for row in range(1 << count):
+            yield {name: (row >> (count - 1 - i)) & 1 for i, name in enumerate(self.input_names)}
+
+
+@pytest.fixture(params=range(RANDOM_CIRCUITS))
+def random_circuit(request) -> RandomCircuit:
+    return RandomCircuit(request.param)
+
+
+@pytest.fixture(params=range(RANDOM_CIRCUITS))
+def constant_circuit(request) -> RandomCircuit:
+    """A random circuit whose gates may also read VCC or GND"""
+    return RandomCircuit(request.param, constants=True)
@@ -0,0 +1,160 @@
+# faults.py
+import argparse
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from netlist import GATE_PIN_NAMES, gate_label
+from simulator import Circuit, CompiledCircuit
+
+# Stuck-at fault simulation with parallel fault injection. Bit lane 0 of
+# every net value is the fault-free machine and lane k the machine with
+# fault k, so one evaluation of the gate network simulates a whole group of
+# faulty circuits against one input vector. A fault is detected when some
+# output lane differs from lane 0.
+
+FAULT_LANES = 256  # Faulty machines per pass, plus the good machine in lane 0
+MAX_EXHAUSTIVE_INPUTS = 16  # Without a stimulus, inputs up to this many are swept exhaustively
+
+# Logic pins of a gate in CompiledGate order: inputs, then the output
+LOGIC_PINS = [name for name in GATE_PIN_NAMES if name.startswith('input')] + ['output']
+
+
+class Fault:
+    """One gate pin stuck at 0 or 1"""
+
+    def __init__(self, gate: int, name: str, pin: str, value: int):
+        self.gate = gate  # Index into the compiled gate network
+        self.name = name
+        self.pin = pin
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"Fault({self.gate}, {self.name!r}, {self.pin!r}, {self.value})"
+
+    def __str__(self) -> str:
+        return f"{self.name}.{self.pin} stuck-at-{self.value}"
+
+
+class FaultReport:
+    """Which faults a set of input vectors detects"""
+
+    def __init__(self, faults: List[Fault], detected_by: Dict[int, int], vectors: int):
+        self.faults = faults
+        self.detected_by = detected_by  # Fault index -> index of the first vector detecting it
+        self.vectors = vectors
+
+    @property
+    def detected(self) -> List[Fault]:
+        return [fault for i, fault in enumerate(self.faults) if i in self.detected_by]
+
+    @property
+    def undetected(self) -> List[Fault]:
+        return [fault for i, fault in enumerate(self.faults) if i not in self.detected_by]
+
+    @property
+    def coverage(self) -> float:
+        return len(self.detected_by) / len(self.faults) if self.faults else 1.0
+
+    def format(self) -> str:
+        lines = [f"Fault coverage: {len(self.detected_by)}/{len(self.faults)} "
+                 f"({self.coverage:.1%}) over {self.vectors} vectors"]
+        undetected = self.undetected
+        if undetected:
+            lines.append("Undetected faults:")
+            lines.extend(f"  {fault}" for fault in undetected)
+        return "\n".join(lines)
+
+
+def fault_list(compiled: CompiledCircuit) -> List[Fault]:
+    """Stuck-at-0 and stuck-at-1 on every logic pin of every gate"""
+    faults = []
+    for i, gate in enumerate(compiled.network.gates):
+        name = gate_label(gate, i)
+        pins = LOGIC_PINS[:len(gate.inputs)] + ['output']
+        for pin in pins:
+            for value in (0, 1):
+                faults.append(Fault(i, name, pin, value))
+    return faults
+
+
+def _masks(faults: Sequence[Fault]) -> Dict[int, Dict[int, Tuple[int, int]]]:
+    """Per gate and pin slot, the (clear, set) lane masks injecting faults in lanes 1.."""
+    masks: Dict[int, Dict[int, Tuple[int, int]]] = {}
+    for lane, fault in enumerate(faults, 1):
+        slot = -1 if fault.pin == 'output' else LOGIC_PINS.index(fault.pin)
+        clear, set_ = masks.setdefault(fault.gate, {}).get(slot, (0, 0))
+        if fault.value:
+            set_ |= 1 << lane
+        else:
+            clear |= 1 << lane
+        masks[fault.gate][slot] = (clear, set_)
+    return masks
+
+
+def simulate_faults(circuit: Union[Circuit, CompiledCircuit], vectors: Iterable[Sequence[int]],
+                    faults: Optional[List[Fault]] = None) -> FaultReport:
+    """Run every input vector (one value per input, in input order) against every fault.
+
+    Faults are simulated FAULT_LANES at a time; a group stops early once all
+    of its faults are detected.
+    """
+    compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile()
+    faults = fault_list(compiled) if faults is None else faults
+    vectors = [tuple(vector) for vector in vectors]
+    input_names = list(compiled.input_nets)
+    output_nets = [net for net in compiled.output_nets.values() if net is not None]
+    detected_by: Dict[int, int] = {}
+
+    for start in range(0, len(faults), FAULT_LANES):
+        group = faults[start:start + FAULT_LANES]
+        ones = (1 << (len(group) + 1)) - 1
+        masks = _masks(group)
+        pending = ones & ~1
+        for v, vector in enumerate(vectors):
+            inputs = {name: ones if value else 0 for name, value in zip(input_names, vector)}
+            values = compiled.network.evaluate_faults(compiled.sources(inputs, ones), ones, masks)
+            differs = 0
+            for net in output_nets:
+                value = values.get(net, 0)
+                differs |= value ^ (ones if value & 1 else 0)
+            newly = differs & pending
+            pending &= ~newly
+            while newly:
+                lane = newly.bit_length() - 1
+                detected_by[start + lane - 1] = v
+                newly &= ~(1 << lane)
+            if not pending:
+                break
+    return FaultReport(faults, detected_by, len(vectors))
+
+
+def exhaustive_vectors(count: int) -> List[Tuple[int, ...]]:
+    return list(product((0, 1), repeat=count))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Stuck-at fault coverage of a circuit JSON file')
+    parser.add_argument('circuit_json', type=str, help='Path to circuit JSON file')
+    parser.add_argument('--stimulus', type=str, help='File of input vectors; exhaustive if omitted')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from json_circ import CircuitConverter
+    from sweep import read_stimulus
+
+    args = parse_args()
+    try:
+        circuit = CircuitConverter().setup_headless(args.circuit_json)
+    except ValueError as e:
+        raise SystemExit(f"Error loading {args.circuit_json}: {e}")
+    if args.stimulus:
+        try:
+            vectors = read_stimulus(args.stimulus, len(circuit.inputs))
+        except ValueError as e:
+            raise SystemExit(f"Error reading {args.stimulus}: {e}")
+    elif len(circuit.inputs) <= MAX_EXHAUSTIVE_INPUTS:
+        vectors = exhaustive_vectors(len(circuit.inputs))
+    else:
+        raise SystemExit(f"{len(circuit.inputs)} inputs is too many to sweep; pass --stimulus")
+    print(simulate_faults(circuit, vectors).format())
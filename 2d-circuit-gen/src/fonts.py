@@ -0,0 +1,38 @@
+# fonts.py
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+# Shared fonts and rendered labels. Fonts are created once per (name, size)
+# and rendered text is kept in an LRU cache keyed by (text, size, color), so
+# drawing a label that has not changed is a single blit.
+
+TEXT_CACHE_SIZE = 512  # Rendered text surfaces kept before the least recently used is dropped
+
+_fonts: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+_text_cache: 'OrderedDict[tuple, pygame.Surface]' = OrderedDict()
+
+
+def get_font(size: int, name: Optional[str] = None) -> pygame.font.Font:
+    """The shared font of this size (pygame's default font unless name is given)"""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(name, size)
+    return font
+
+
+def render_text(text: str, size: int, color: Tuple[int, int, int],
+                name: Optional[str] = None) -> pygame.Surface:
+    """Antialiased text surface, rendered only the first time it is asked for"""
+    key = (text, size, tuple(color), name)
+    surface = _text_cache.get(key)
+    if surface is not None:
+        _text_cache.move_to_end(key)
+        return surface
+    surface = get_font(size, name).render(text, True, color)
+    _text_cache[key] = surface
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return surface
@@ -0,0 +1,181 @@
+# geometry.py
+from bisect import bisect_right
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+# Constants
+GRID_X1 = 225
+GRID_X2 = 794
+GRID_X2E = 790
+GRID_X3 = 1383
+GRID_Y1 = 288
+GRID_Y2 = 373
+GRID_Y3 = GRID_Y1 + 143  # Y coordinate for lower grid start
+GRID_Y4 = GRID_Y2 + 143  # Y coordinate for lower grid end
+
+X1_RAIL = 225
+X2_RAIL = 308
+X3_RAIL = 833
+X4_RAIL = 926
+Y1_UP_RAIL = 207    # Top positive rail
+Y2_UP_RAIL = 233    # Top negative rail
+Y1_DOWN_RAIL = 566  # Bottom positive rail
+Y2_DOWN_RAIL = 592  # Bottom negative rail
+RAIL_YS = (Y1_UP_RAIL, Y2_UP_RAIL, Y1_DOWN_RAIL, Y2_DOWN_RAIL)
+RAIL_SEGMENTS = 5
+RAIL_SEGMENT_STEP = 116
+
+CELL_PITCH = 19  # Pixel distance between neighbouring holes
+
+# Lattice blocks: (x0, y0, columns, rows, is_rail). Hole IDs are dense and
+# laid out block by block, column-major inside a block.
+def _count(start, end):
+    return (end - start) // CELL_PITCH + 1
+
+ROWS_PER_HALF = _count(GRID_Y1, GRID_Y2)
+SECTION_COLUMNS = (_count(GRID_X1, GRID_X2), _count(GRID_X2E, GRID_X3))
+
+BLOCKS: List[Tuple[int, int, int, int, bool]] = [
+    (GRID_X1, GRID_Y1, SECTION_COLUMNS[0], ROWS_PER_HALF, False),   # Upper left
+    (GRID_X2E, GRID_Y1, SECTION_COLUMNS[1], ROWS_PER_HALF, False),  # Upper right
+    (GRID_X1, GRID_Y3, SECTION_COLUMNS[0], ROWS_PER_HALF, False),   # Lower left
+    (GRID_X2E, GRID_Y3, SECTION_COLUMNS[1], ROWS_PER_HALF, False),  # Lower right
+]
+for _y in RAIL_YS:
+    for _i in range(RAIL_SEGMENTS):
+        _k = RAIL_SEGMENT_STEP * _i
+        BLOCKS.append((X1_RAIL + _k, _y, _count(X1_RAIL + _k, X2_RAIL + _k), 1, True))
+        BLOCKS.append((X3_RAIL + _k, _y, _count(X3_RAIL + _k, X4_RAIL + _k), 1, True))
+
+BLOCK_BASE: List[int] = []
+HOLE_COUNT = 0
+for _x0, _y0, _cols, _rows, _ in BLOCKS:
+    BLOCK_BASE.append(HOLE_COUNT)
+    HOLE_COUNT += _cols * _rows
+
+
+def hole_pos(hole_id: int) -> Tuple[int, int]:
+    """Pixel coordinates of a hole, derived from the lattice"""
+    block = bisect_right(BLOCK_BASE, hole_id) - 1
+    x0, y0, _, rows, _ = BLOCKS[block]
+    column, row = divmod(hole_id - BLOCK_BASE[block], rows)
+    return (x0 + column * CELL_PITCH, y0 + row * CELL_PITCH)
+
+
+# Static lookup tables derived once from the lattice
+HOLE_POS: Tuple[Tuple[int, int], ...] = tuple(hole_pos(i) for i in range(HOLE_COUNT))
+HOLE_IDS: Dict[Tuple[int, int], int] = {pos: i for i, pos in enumerate(HOLE_POS)}
+HOLE_IS_RAIL = bytearray(HOLE_COUNT)
+STRIP_OF: List[int] = [0] * HOLE_COUNT          # hole id -> strip id
+STRIP_HOLES: List[Tuple[int, ...]] = []         # strip id -> hole ids
+COLUMN_STRIPS: Dict[Tuple[int, int], int] = {}  # (x, half start y) -> strip id
+RAIL_STRIPS: Dict[int, int] = {}                # rail y -> strip id
+
+
+def _build_strips():
+    for block, (x0, y0, columns, rows, is_rail) in enumerate(BLOCKS):
+        if is_rail:
+            continue
+        base = BLOCK_BASE[block]
+        for column in range(columns):
+            COLUMN_STRIPS[(x0 + column * CELL_PITCH, y0)] = len(STRIP_HOLES)
+            STRIP_HOLES.append(tuple(range(base + column * rows, base + (column + 1) * rows)))
+
+    rails: Dict[int, List[int]] = {}
+    for block, (_, y0, columns, _, is_rail) in enumerate(BLOCKS):
+        if is_rail:
+            segment = range(BLOCK_BASE[block], BLOCK_BASE[block] + columns)
+            rails.setdefault(y0, []).extend(segment)
+            for hole_id in segment:
+                HOLE_IS_RAIL[hole_id] = 1
+    for y in RAIL_YS:
+        RAIL_STRIPS[y] = len(STRIP_HOLES)
+        STRIP_HOLES.append(tuple(rails[y]))
+
+    for strip_id, holes in enumerate(STRIP_HOLES):
+        for hole_id in holes:
+            STRIP_OF[hole_id] = strip_id
+
+_build_strips()
+
+
+class PointIndex:
+    """Dense integer IDs for every point the simulator sees.
+
+    Breadboard holes keep their lattice IDs; loose terminals (VCC, GND,
+    switch outputs, gate pins, output circles) are appended on first use.
+    """
+
+    def __init__(self):
+        self.ids: Dict[Hashable, int] = dict(HOLE_IDS)
+        self.points: List[Hashable] = list(HOLE_POS)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def get(self, point) -> Optional[int]:
+        return self.ids.get(point)
+
+    def id_of(self, point) -> int:
+        """Return the ID of point, allocating one if it is new"""
+        point_id = self.ids.get(point)
+        if point_id is None:
+            point_id = len(self.points)
+            self.ids[point] = point_id
+            self.points.append(point)
+        return point_id
+
+
+class PointSet:
+    """Set of points backed by one flag byte per PointIndex ID"""
+
+    def __init__(self, index: PointIndex):
+        self.index = index
+        self.flags = bytearray(len(index))
+        self.count = 0
+
+    def _reserve(self):
+        missing = len(self.index) - len(self.flags)
+        if missing > 0:
+            self.flags.extend(bytes(missing))
+
+    def has_id(self, point_id: int) -> bool:
+        return point_id < len(self.flags) and self.flags[point_id] == 1
+
+    def add_id(self, point_id: int):
+        if point_id >= len(self.flags):
+            self._reserve()
+        if not self.flags[point_id]:
+            self.flags[point_id] = 1
+            self.count += 1
+
+    def discard_id(self, point_id: int):
+        if self.has_id(point_id):
+            self.flags[point_id] = 0
+            self.count -= 1
+
+    def add(self, point):
+        if point is not None:
+            self.add_id(self.index.id_of(point))
+
+    def update(self, points: Iterable):
+        for point in points:
+            self.add(point)
+
+    def clear(self):
+        self._reserve()
+        self.flags[:] = bytes(len(self.flags))
+        self.count = 0
+
+    def __contains__(self, point) -> bool:
+        point_id = self.index.get(point)
+        return point_id is not None and self.has_id(point_id)
+
+    def __iter__(self) -> Iterator:
+        points = self.index.points
+        return (points[i] for i, flag in enumerate(self.flags) if flag)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        return f"PointSet({self.count} points)"
@@ -0,0 +1,100 @@
+# hittest.py
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from netlist import GATE_PIN_NAMES
+
+# Click hit-testing through a uniform grid of buckets. Every clickable
+# anchor (gate pin, LED terminal, switch output, VCC/GND, output circle,
+# breadboard hole) sits in the bucket of its cell, so a click only looks at
+# the few cells its reach overlaps instead of every point on the board.
+
+# Anchor kinds, in the order a click prefers them when several are in reach
+PIN = 0
+LED_TERMINAL = 1
+SWITCH_OUTPUT = 2
+SUPPLY = 3
+OUTPUT = 4
+HOLE = 5
+
+CLICK_RADIUS = 8  # How far from an anchor a click still hits it
+CELL_SIZE = 16    # Bucket size; at least 2 * CLICK_RADIUS keeps a query to 4 cells
+
+Point = Tuple[int, int]
+
+
+class Anchor:
+    """A clickable point, the kind of thing it belongs to and its owner"""
+
+    __slots__ = ('point', 'kind', 'owner', 'order')
+
+    def __init__(self, point: Point, kind: int, owner, order: int):
+        self.point = point
+        self.kind = kind
+        self.owner = owner
+        self.order = order  # Insertion order, the tie-break between equal hits
+
+    def __repr__(self) -> str:
+        return f"Anchor({self.point}, kind={self.kind})"
+
+
+class SpatialHash:
+    """Anchors bucketed by grid cell for O(1) click lookup"""
+
+    def __init__(self, cell_size: int = CELL_SIZE, radius: int = CLICK_RADIUS):
+        self.cell_size = cell_size
+        self.radius = radius
+        self.cells: Dict[Tuple[int, int], List[Anchor]] = {}
+        self.owned: Dict[Hashable, List[Anchor]] = {}
+        self._order = 0
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def add(self, point: Point, kind: int, owner=None) -> Anchor:
+        anchor = Anchor(point, kind, owner, self._order)
+        self._order += 1
+        self.cells.setdefault(self._cell(*point), []).append(anchor)
+        if owner is not None:
+            self.owned.setdefault(owner, []).append(anchor)
+        return anchor
+
+    def add_component(self, component, kind: int = PIN):
+        """Every pin (or LED terminal) of a gate or LED, owned by the component"""
+        for name in GATE_PIN_NAMES + ['anode', 'cathode']:
+            point = getattr(component, f"{name}_pos", None)
+            if point is not None:
+                self.add(point, kind, component)
+
+    def remove_owner(self, owner):
+        for anchor in self.owned.pop(owner, ()):
+            cell = self._cell(*anchor.point)
+            bucket = self.cells[cell]
+            bucket.remove(anchor)
+            if not bucket:
+                del self.cells[cell]
+
+    def move_component(self, component, kind: int = PIN):
+        """Re-bucket a component after its pins moved"""
+        self.remove_owner(component)
+        self.add_component(component, kind)
+
+    def query(self, pos: Point) -> Optional[Anchor]:
+        """The anchor a click at pos hits: highest priority kind, then nearest"""
+        x, y = pos
+        radius = self.radius
+        reach = radius * radius
+        min_cx, min_cy = self._cell(x - radius, y - radius)
+        max_cx, max_cy = self._cell(x + radius, y + radius)
+        best = None
+        best_key = None
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                for anchor in self.cells.get((cx, cy), ()):
+                    dx = anchor.point[0] - x
+                    dy = anchor.point[1] - y
+                    distance = dx * dx + dy * dy
+                    if distance <= reach:
+                        key = (anchor.kind, distance, anchor.order)
+                        if best_key is None or key < best_key:
+                            best, best_key = anchor, key
+        return best
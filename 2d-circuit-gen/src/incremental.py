@@ -0,0 +1,337 @@
+# incremental.py
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+from geometry import HOLE_COUNT, STRIP_HOLES, STRIP_OF, PointIndex, PointSet
+from netlist import (GATE_LOGIC4, LOGIC_0, LOGIC_1, LOGIC_X, LOGIC_Z, Conflict, DisjointSet, gate_pins,
+                     is_conflict, warn_unsettled)
+
+NO_DRIVE = (0, 0, 0, 0)
+
+
+def _driver_counts(key, level: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    """What one driver adds to its net's [high, low, drivers, gate drivers] counts"""
+    if level == LOGIC_Z:
+        return NO_DRIVE
+    is_gate = isinstance(key, tuple) and key[0] == 'gate'
+    return level[0], level[1], 1, int(is_gate)
+
+
+# Oscillating feedback (e.g. a NOT gate wired to itself) never settles;
+# stop after this many evaluations per gate and keep the last state.
+MAX_EVALUATIONS_PER_GATE = 64
+
+
+class IncrementalEngine:
+    """Power simulation that keeps its net partition and drive state across edits.
+
+    Adding a wire merges two nets, removing one re-partitions only the net it
+    belonged to, and only gates reading a net whose state flipped are
+    re-evaluated. Work per edit scales with the nets and gates it touches,
+    not with the size of the board.
+
+    Nets are four-valued: each keeps a count of drivers pulling it high and
+    low, so a net with both is X (unknown_points) and one with neither is Z
+    (floating_points). powered_points holds every point driven high.
+    The same counts flag shorts and output contention (conflict_points).
+    """
+
+    def __init__(self, index: PointIndex, vcc_pos, gnd_pos,
+                 powered_points: Optional[PointSet] = None,
+                 grounded_points: Optional[PointSet] = None,
+                 unknown_points: Optional[PointSet] = None,
+                 floating_points: Optional[PointSet] = None,
+                 conflict_points: Optional[PointSet] = None):
+        self.index = index
+        self.vcc_pos = vcc_pos
+        self.gnd_pos = gnd_pos
+        self.powered_points = powered_points if powered_points is not None else PointSet(index)
+        self.grounded_points = grounded_points if grounded_points is not None else PointSet(index)
+        self.unknown_points = unknown_points if unknown_points is not None else PointSet(index)
+        self.floating_points = floating_points if floating_points is not None else PointSet(index)
+        self.conflict_points = conflict_points if conflict_points is not None else PointSet(index)
+        self.reset()
+
+    def reset(self):
+        """Drop every wire, gate and input source, keeping VCC and GND"""
+        self.nets = DisjointSet(len(self.index))
+        self.members: Dict[int, List[int]] = {}      # net root -> point IDs (non-singletons only)
+        self.edges: List[Optional[Tuple[int, int]]] = []  # wires and gate legs
+        self.edges_at: Dict[int, List[int]] = {}     # point ID -> incident edge indices
+        self.wire_edges: List[Optional[int]] = []    # wire index -> edge index
+        self.edge_wires: Dict[int, int] = {}         # edge index -> wire index
+        self.drivers: Dict[int, Dict] = {}           # point ID -> driver key -> (high, low)
+        self.drive: Dict[int, List[int]] = {}        # net root -> [high, low, drivers, gate drivers] counts
+        self.gates: Dict[int, object] = {}
+        self.gate_edges: Dict[int, List[int]] = {}
+        self.gate_state: Dict[int, Tuple[int, int]] = {}
+        self.gate_point_ids: Dict[int, Dict[str, int]] = {}  # gate -> pin name -> point ID
+        self.readers: Dict[int, Set[int]] = {}       # point ID -> gates reading it
+        self._next_gate = 0
+        self._pending = deque()
+        self._queued: Set[int] = set()
+        self.powered_points.clear()
+        self.grounded_points.clear()
+        self.unknown_points.clear()
+        self.floating_points.clear()
+        self.conflict_points.clear()
+        for point_id in range(len(self.index)):
+            self.floating_points.add_id(point_id)
+
+        for strip in STRIP_HOLES:
+            for hole_id in strip[1:]:
+                self.nets.union(strip[0], hole_id)
+            self.members[self.nets.find(strip[0])] = list(strip)
+
+        self.vcc_id = self._point(self.vcc_pos)
+        self.gnd_id = self._point(self.gnd_pos)
+        self.grounded_points.add_id(self.gnd_id)
+        self._set_driver(self.vcc_id, 'vcc', LOGIC_1)
+        self._set_driver(self.gnd_id, 'gnd', LOGIC_0)
+
+    # Public edit API
+
+    def add_wire(self, start, end) -> int:
+        """Connect two points and return the wire index"""
+        edge = self._add_edge(self._point(start), self._point(end))
+        self.edge_wires[edge] = len(self.wire_edges)
+        self.wire_edges.append(edge)
+        self._settle()
+        return len(self.wire_edges) - 1
+
+    def remove_wire(self, wire_index: int):
+        edge = self.wire_edges[wire_index]
+        if edge is None:
+            return
+        self.wire_edges[wire_index] = None
+        del self.edge_wires[edge]
+        self._remove_edge(edge)
+        self._settle()
+
+    def add_gate(self, gate) -> int:
+        """Place a gate: plug its legs into their holes and evaluate it"""
+        gate_id = self._next_gate
+        self._next_gate += 1
+        self.gates[gate_id] = gate
+        self.gate_state[gate_id] = LOGIC_Z
+        self.gate_edges[gate_id] = []
+        self.gate_point_ids[gate_id] = {}
+        for pin_name, pin_pos, connection in gate_pins(gate):
+            pin_id = self._point(pin_pos)
+            self.gate_point_ids[gate_id][pin_name] = pin_id
+            if connection is not None:
+                self.gate_edges[gate_id].append(self._add_edge(pin_id, self._point(connection)))
+            if pin_name != 'output':
+                self.readers.setdefault(pin_id, set()).add(gate_id)
+        self._schedule(gate_id)
+        self._settle()
+        return gate_id
+
+    def remove_gate(self, gate_id: int):
+        gate = self.gates.pop(gate_id, None)
+        if gate is None:
+            return
+        pins = self.gate_point_ids.pop(gate_id)
+        self.gate_state.pop(gate_id)
+        self._set_driver(pins['output'], ('gate', gate_id), LOGIC_Z)
+        for pin_id in pins.values():
+            self.readers.get(pin_id, set()).discard(gate_id)
+        for edge in self.gate_edges.pop(gate_id):
+            self._remove_edge(edge)
+        self._settle()
+
+    def add_terminals(self, points):
+        """Register loose points such as output circles, so they read Z until wired"""
+        for point in points:
+            self._point(point)
+
+    def set_source(self, point, is_on: bool):
+        """Drive a point from an input source such as an InputSwitch"""
+        self._set_driver(self._point(point), ('source', point), LOGIC_1 if is_on else LOGIC_0)
+        self._settle()
+
+    def conflicts(self) -> List[Conflict]:
+        """Shorts and contention on the board, from the per-net driver counts"""
+        found = []
+        gnd_root = self.nets.find(self.gnd_id)
+        vcc_root = self.nets.find(self.vcc_id)
+        for root, counts in self.drive.items():
+            if not is_conflict(*counts):
+                continue
+            wires, gates = set(), set()
+            for point_id in self._members(root):
+                for edge in self.edges_at.get(point_id, ()):
+                    if edge in self.edge_wires:
+                        wires.add(self.edge_wires[edge])
+                for key in self.drivers.get(point_id, ()):
+                    if isinstance(key, tuple) and key[0] == 'gate':
+                        gates.add(key[1])
+            kind = 'short' if root == vcc_root == gnd_root else 'contention'
+            found.append(Conflict(kind, root, sorted(wires), sorted(gates)))
+        return found
+
+    # Net bookkeeping
+
+    def _point(self, point) -> int:
+        point_id = self.index.id_of(point)
+        if point_id >= len(self.nets.parent):
+            # New points start out as undriven singleton nets
+            for new_id in range(len(self.nets.parent), len(self.index)):
+                self.floating_points.add_id(new_id)
+            self.nets.grow(len(self.index))
+        return point_id
+
+    def _members(self, root: int) -> List[int]:
+        return self.members.get(root) or [root]
+
+    def _status(self, root: int) -> Tuple[bool, bool, bool, bool]:
+        """(driven high, driven low, grounded, in conflict) for a net"""
+        counts = self.drive.get(root, NO_DRIVE)
+        return counts[0] > 0, counts[1] > 0, self.nets.find(self.gnd_id) == root, is_conflict(*counts)
+
+    def _level(self, point_id: int) -> Tuple[int, int]:
+        high, low, _, _ = self._status(self.nets.find(point_id))
+        return int(high), int(low)
+
+    def _apply(self, point_ids: List[int], old: Tuple[bool, ...], new: Tuple[bool, ...]):
+        """Repaint point flags for a group whose status changed and wake its readers"""
+        if old == new:
+            return
+        for flags, was, now in ((self.powered_points, old[0], new[0]),
+                                (self.grounded_points, old[2], new[2]),
+                                (self.unknown_points, old[0] and old[1], new[0] and new[1]),
+                                (self.floating_points, not (old[0] or old[1]), not (new[0] or new[1])),
+                                (self.conflict_points, old[3], new[3])):
+            if was == now:
+                continue
+            for point_id in point_ids:
+                if now:
+                    flags.add_id(point_id)
+                else:
+                    flags.discard_id(point_id)
+        for point_id in point_ids:
+            for gate_id in self.readers.get(point_id, ()):
+                self._schedule(gate_id)
+
+    def _add_edge(self, a: int, b: int) -> int:
+        edge = len(self.edges)
+        self.edges.append((a, b))
+        self.edges_at.setdefault(a, []).append(edge)
+        self.edges_at.setdefault(b, []).append(edge)
+
+        root_a, root_b = self.nets.find(a), self.nets.find(b)
+        if root_a != root_b:
+            status_a, status_b = self._status(root_a), self._status(root_b)
+            members_a, members_b = self._members(root_a), self._members(root_b)
+            root = self.nets.union(root_a, root_b)
+            self.members.pop(root_a, None)
+            self.members.pop(root_b, None)
+            larger, smaller = (members_a, members_b) if len(members_a) >= len(members_b) else (members_b, members_a)
+            larger.extend(smaller)
+            self.members[root] = larger
+            counts = [a + b for a, b in zip(self.drive.pop(root_a, NO_DRIVE), self.drive.pop(root_b, NO_DRIVE))]
+            if counts[2]:
+                self.drive[root] = counts
+            status = self._status(root)
+            self._apply(members_a, status_a, status)
+            self._apply(members_b, status_b, status)
+        return edge
+
+    def _remove_edge(self, edge: int):
+        a, b = self.edges[edge]
+        self.edges[edge] = None
+        self.edges_at[a].remove(edge)
+        self.edges_at[b].remove(edge)
+        self._split(self.nets.find(a))
+
+    def _split(self, root: int):
+        """Re-partition a single net after one of its edges went away"""
+        old_status = self._status(root)
+        point_ids = self._members(root)
+        self.members.pop(root, None)
+        self.drive.pop(root, None)
+
+        parent, size = self.nets.parent, self.nets.size
+        for point_id in point_ids:
+            parent[point_id] = point_id
+            size[point_id] = 1
+        for point_id in point_ids:
+            if point_id < HOLE_COUNT:
+                self.nets.union(STRIP_HOLES[STRIP_OF[point_id]][0], point_id)
+            for edge in self.edges_at.get(point_id, ()):
+                a, b = self.edges[edge]
+                self.nets.union(a, b)
+
+        groups: Dict[int, List[int]] = {}
+        for point_id in point_ids:
+            groups.setdefault(self.nets.find(point_id), []).append(point_id)
+        for new_root, group in groups.items():
+            if len(group) > 1:
+                self.members[new_root] = group
+            counts = [0, 0, 0, 0]
+            for point_id in group:
+                for key, level in self.drivers.get(point_id, {}).items():
+                    for i, delta in enumerate(_driver_counts(key, level)):
+                        counts[i] += delta
+            if counts[2]:
+                self.drive[new_root] = counts
+            self._apply(group, old_status, self._status(new_root))
+
+    def _set_driver(self, point_id: int, key, level: Tuple[int, int]):
+        """Make key drive point_id at level; LOGIC_Z removes the driver"""
+        drivers = self.drivers.setdefault(point_id, {})
+        old_level = drivers.get(key, LOGIC_Z)
+        if old_level == level:
+            return
+        if level == LOGIC_Z:
+            del drivers[key]
+        else:
+            drivers[key] = level
+        root = self.nets.find(point_id)
+        old_status = self._status(root)
+        counts = self.drive.setdefault(root, [0, 0, 0, 0])
+        for i, (new, old) in enumerate(zip(_driver_counts(key, level), _driver_counts(key, old_level))):
+            counts[i] += new - old
+        if not counts[2]:
+            del self.drive[root]
+        self._apply(self._members(root), old_status, self._status(root))
+
+    # Gate evaluation over the fan-out of changed nets
+
+    def _schedule(self, gate_id: int):
+        if gate_id not in self._queued and gate_id in self.gates:
+            self._queued.add(gate_id)
+            self._pending.append(gate_id)
+
+    def _gate_output(self, gate_id: int) -> Tuple[int, int]:
+        pins = self.gate_point_ids[gate_id]
+        if not self.grounded_points.has_id(pins['gnd']):
+            return LOGIC_Z
+        power = self._level(pins['vcc'])
+        if power == LOGIC_X:
+            return LOGIC_X
+        if power != LOGIC_1:
+            return LOGIC_Z
+        inputs = []
+        for name in ('input1', 'input2'):
+            if name in pins:
+                level = self._level(pins[name])
+                inputs.append(LOGIC_X if level == LOGIC_Z else level)
+        return GATE_LOGIC4[self.gates[gate_id].kind](*inputs, 1)
+
+    def _settle(self):
+        budget = MAX_EVALUATIONS_PER_GATE * max(1, len(self.gates))
+        while self._pending:
+            gate_id = self._pending.popleft()
+            self._queued.discard(gate_id)
+            budget -= 1
+            if budget < 0:
+                warn_unsettled("circuit did not settle, stopping evaluation")
+                self._pending.clear()
+                self._queued.clear()
+                break
+            level = self._gate_output(gate_id)
+            if level == self.gate_state[gate_id]:
+                continue
+            self.gate_state[gate_id] = level
+            self._set_driver(self.gate_point_ids[gate_id]['output'], ('gate', gate_id), level)
@@ -1,12 +1,11 @@
 import json
-import pygame
 from typing import Dict, List, Tuple, Set
+from geometry import GRID_X1, GRID_Y1, CELL_PITCH
+
+GATE_TYPES = ('NAND', 'NOR', 'AND', 'OR', 'NOT')  # Longest match first
 
 class CircuitConverter:
     def __init__(self):
-        self.GRID_X1 = 225
-        self.GRID_Y1 = 288
-        self.cell_size = 19.5
         self.gate_spacing = 100
         self.used_positions = set()
         self.component_positions = {}
@@ -19,16 +18,10 @@ class CircuitConverter:
             
     def extract_gate_type(self, ic_name: str) -> str:
         """Extract gate type from IC name (e.g., 'AND7400' -> 'AND')"""
-        if 'AND' in ic_name:
-            return 'AND'
-        elif 'NAND' in ic_name:
-            return 'NAND'
-        elif 'OR' in ic_name:
-            return 'OR'
-        elif 'NOR' in ic_name:
-            return 'NOR'
-        elif 'NOT' in ic_name:
-            return 'NOT'
+        # NAND and NOR contain AND and OR, so they have to be matched first
+        for gate_type in GATE_TYPES:
+            if gate_type in ic_name:
+                return gate_type
         return ic_name
 
     def parse_gate_id(self, component_str: str) -> tuple:
@@ -51,7 +44,9 @@ class CircuitConverter:
                 if current_number:
                     numbers.append(int(current_number))
                     current_number = ''
-                gate_type += char
+                # Only the leading letters name the gate; later ones are the pin ('IN', 'OUT')
+                if not numbers:
+                    gate_type += char
             elif char.isdigit():
                 current_number += char
                 
@@ -65,19 +60,30 @@ class CircuitConverter:
 
     def get_next_position(self, component_type: str) -> tuple:
         """Get next available grid position for a component"""
-        base_x = self.GRID_X1 + len(self.used_positions) * self.gate_spacing
-        base_y = self.GRID_Y1 + 50
+        base_x = GRID_X1 + len(self.used_positions) * self.gate_spacing
+        base_y = GRID_Y1 + 50
         
         pos = (base_x, base_y)
         while pos in self.used_positions:
-            base_x += self.cell_size
+            base_x += CELL_PITCH
             pos = (base_x, base_y)
             
         self.used_positions.add(pos)
         return pos
 
-    def create_gates(self, circuit_data: dict) -> dict:
-        """Create gates based on circuit description"""
+    def input_point(self, input_num: int) -> tuple:
+        """Output point of the input switch for IN<input_num>"""
+        return (300 + (input_num - 1) * 100, 80)
+
+    def output_point(self, output_num: int) -> tuple:
+        """Point the OUT<output_num> indicator is wired to"""
+        return (800 + (output_num - 1) * 100, 750)
+
+    def create_gates(self, circuit_data: dict, headless: bool = False, strict: bool = False) -> dict:
+        """Create gates based on circuit description
+
+        IC boards of an unknown gate type are skipped, or raise ValueError when strict is set.
+        """
         gates = {}
         
         # Process IC boards and create gates
@@ -86,15 +92,24 @@ class CircuitConverter:
             ic_name, count_part = board.split('-')
             gate_type = self.extract_gate_type(ic_name.strip())
             num_gates = int(count_part.split(':')[1].strip())
+            if gate_type not in GATE_TYPES:
+                if strict:
+                    raise ValueError(f"Unknown gate type in IC board '{board}'")
+                print(f"Warning: skipping IC board '{board}' of unknown gate type")
+                continue
             
             # Create specified number of each gate type
             for i in range(num_gates):
                 gate_id = f"{gate_type}{i+1}"
                 pos = self.get_next_position(gate_type)
                 self.component_positions[gate_id] = pos
-                
+
+                if headless:
+                    # Pygame-free gates for the simulator core
+                    from simulator import GateSpec
+                    gates[gate_id] = GateSpec(gate_type, gate_id)
                 # Map gate types to simulator classes
-                if gate_type == 'AND':
+                elif gate_type == 'AND':
                     from AndGate import AndGate
                     gates[gate_id] = AndGate(*pos)
                 elif gate_type == 'NAND':
@@ -112,44 +127,56 @@ class CircuitConverter:
                     
         return gates
         
-    def create_connections(self, circuit_data: dict, gates: dict) -> list:
-        """Create wire connections based on circuit description"""
+    def create_connections(self, circuit_data: dict, gates: dict, strict: bool = False) -> list:
+        """Create wire connections based on circuit description
+
+        A connection naming a gate or pin that does not exist is skipped with
+        a warning, or raises ValueError when strict is set.
+        """
         wires = []
+
+        def skip(message: str):
+            if strict:
+                raise ValueError(message)
+            print(f"Warning: {message}")
         
         for connection in circuit_data['Connections']:
-            from_component, to_component = connection.split(' to ')
+            from_component, to_component = (part.strip() for part in connection.split(' to '))
             
             # Get source connection point
             if from_component.startswith('IN'):
                 # Input switch connection
-                input_num = int(from_component[2:]) - 1
-                from_pos = (300 + input_num * 100, 80)
+                from_pos = self.input_point(int(from_component[2:]))
             else:
                 # Gate output connection
                 gate_type, gate_num, _ = self.parse_gate_id(from_component)
                 gate_id = f"{gate_type}{gate_num}"
                 if gate_id not in gates:
-                    print(f"Warning: Gate {gate_id} not found")
+                    skip(f"Gate {gate_id} not found")
+                    continue
+                if from_component[len(gate_id):] != 'OUT':
+                    skip(f"{from_component} is not a gate output")
                     continue
                 from_pos = gates[gate_id].output_pos
                 
             # Get destination connection point
             if to_component.startswith('OUT'):
                 # Output connection
-                output_num = int(to_component[3:]) - 1
-                to_pos = (800 + output_num * 100, 750)
+                to_pos = self.output_point(int(to_component[3:]))
             else:
                 # Gate input connection
                 gate_type, gate_num, pin_num = self.parse_gate_id(to_component)
                 gate_id = f"{gate_type}{gate_num}"
                 if gate_id not in gates:
-                    print(f"Warning: Gate {gate_id} not found")
+                    skip(f"Gate {gate_id} not found")
                     continue
                     
-                if pin_num == 1:
-                    to_pos = gates[gate_id].input1_pos
-                else:
-                    to_pos = gates[gate_id].input2_pos
+                # Single-input gates name their pin plainly (e.g. 'NOT1IN')
+                pin_name = 'input2' if pin_num == 2 else 'input1'
+                to_pos = getattr(gates[gate_id], f"{pin_name}_pos", None)
+                if to_component[len(gate_id):] not in ('IN', 'IN1', 'IN2') or to_pos is None:
+                    skip(f"{to_component} is not a gate input")
+                    continue
                     
             wires.append((from_pos, to_pos))
             
@@ -166,4 +193,35 @@ class CircuitConverter:
             print(f"Error setting up circuit: {e}")
             import traceback
             traceback.print_exc()
-            return {}, []
\ No newline at end of file
+            return {}, []
+
+    def setup_headless(self, json_path: str):
+        """Build a pygame-free simulator Circuit from a JSON description.
+
+        Gates get ideal power since the description has no power wiring;
+        inputs and outputs keep the IN<n>/OUT<n> names used in the file.
+        Unknown gate types, gates and pins raise ValueError rather than being
+        skipped, so a broken description cannot simulate as a wrong circuit.
+        """
+        from simulator import Circuit
+        circuit_data = self.load_circuit(json_path)
+        gates = self.create_gates(circuit_data, headless=True, strict=True)
+        wires = self.create_connections(circuit_data, gates, strict=True)
+        circuit = Circuit(breadboard=False, ideal_power=True)
+        for gate in gates.values():
+            circuit.add_gate(gate)
+        for start, end in wires:
+            circuit.add_wire(start, end)
+        inputs, outputs = set(), set()
+        for connection in circuit_data['Connections']:
+            for component in connection.split(' to '):
+                component = component.strip()
+                if component.startswith('IN') and component[2:].isdigit():
+                    inputs.add(int(component[2:]))
+                elif component.startswith('OUT') and component[3:].isdigit():
+                    outputs.add(int(component[3:]))
+        for num in sorted(inputs):
+            circuit.add_input(f"IN{num}", self.input_point(num))
+        for num in sorted(outputs):
+            circuit.add_output(f"OUT{num}", self.output_point(num))
+        return circuit
@@ -1,22 +1,36 @@
 import pygame
-import math
-from bboard import propagate_power, render_powered_state, reset_powered_state
-from bboard import powered_points, grounded_points  # Add grounded_points here
+from fonts import render_text
+from bboard import level_of_id, render_background, render_powered_state, reset_powered_state
+from bboard import powered_points, grounded_points, point_index  # Add grounded_points here
+from bboard import unknown_points, floating_points, conflict_points
 from components import InputManager
 from LED import LEDPalette
 from AndGate import AndGatePalette
 from OrGate import OrGatePalette
 from NandGate import NandGatePalette
 from NorGate import NorGatePalette
-from NotGate import NotGate, NotGatePalette
+from NotGate import NotGatePalette
 import argparse
 # After initializing pygame, add:
 from json_circ import CircuitConverter
+from geometry import HOLE_POS
+from incremental import IncrementalEngine
+from simulator import Circuit
+from truthtable import truth_table
+from vcd import VCDWriter
+from redraw import DirtyRegions, PowerWatcher, component_points
+from hittest import HOLE, LED_TERMINAL, OUTPUT, PIN, SUPPLY, SWITCH_OUTPUT, SpatialHash
 
 # Add this after the imports but before pygame.init()
 def parse_args():
     parser = argparse.ArgumentParser(description='Breadboard Circuit Simulator')
     parser.add_argument('--circuit-json', type=str, help='Path to circuit JSON file')
+    parser.add_argument('--vcd', type=str, help='Record switches and outputs to a VCD waveform file')
+    parser.add_argument('--fps', type=int, default=60, help='Frame rate cap, 0 for none')
+    parser.add_argument('--render', choices=['dirty', 'full'], default='dirty',
+                        help='Push only changed areas to the display, or the whole window every frame')
+    parser.add_argument('--no-idle', action='store_true',
+                        help='Keep polling even when nothing is animating')
     return parser.parse_args()
 
 # Initialize Pygame
@@ -39,31 +53,11 @@ or_gate_palette = OrGatePalette(50,350)
 nor_gate_palette = NorGatePalette(50,400)
 not_gate_palette = NotGatePalette(50,450)
 placed_gates = []
+gate_palettes = [and_gate_palette, nand_gate_palette, or_gate_palette, nor_gate_palette, not_gate_palette]
 
 input_manager = InputManager()
 placed_leds = []  # Track placed LEDs
 
-# Constants
-cell_size = 19.5
-GRID_X1 = 225
-GRID_Y1 = 288
-GRID_X2 = 794
-GRID_X2E = 790
-GRID_X3 = 1383
-GRID_Y2 = 373
-X1_RAIL = 225
-X2_RAIL = 308
-X3_RAIL = 833
-X4_RAIL = 926
-Y1_UP_RAIL = 207
-Y2_UP_RAIL = 233
-Y1_DOWN_RAIL = 566
-Y2_DOWN_RAIL = 592
-GRID_Y3 = GRID_Y1 + 143  # Y coordinate for lower grid start
-GRID_Y4 = GRID_Y2 + 143  # Y coordinate for lower grid end
-GRID_Y5 = GRID_Y1 + (5 * cell_size)  # Row 5 y-coordinate
-GRID_Y6 = GRID_Y1 + (6 * cell_size)  # Row 6 y-coordinate
-
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -87,60 +81,136 @@ gnd_pos = (WINDOW_WIDTH // 2, 100)
 output_spacing = 100
 output_circles = [(WINDOW_WIDTH // 2 - 4 * output_spacing + i * output_spacing, WINDOW_HEIGHT - 50) for i in range(9)]
 
-def is_mouse_near_circle(mouse_pos, circle_pos, radius=8):
-    distance = math.sqrt((mouse_pos[0] - circle_pos[0]) ** 2 + (mouse_pos[1] - circle_pos[1]) ** 2)
-    return distance <= radius
-
-def is_mouse_near_point(mouse_pos, point_pos, radius=8):
-    """Helper function to check if mouse is near a point"""
-    distance = math.sqrt((mouse_pos[0] - point_pos[0]) ** 2 + (mouse_pos[1] - point_pos[1]) ** 2)
-    return distance <= radius
-
-def get_grid_points():
-    points = []
-    # Upper grid points
-    for x in range(GRID_X1, GRID_X2 + 1, int(cell_size)):
-        for y in range(GRID_Y1, GRID_Y2 + 1, int(cell_size)):
-            points.append((x, y))
-    # Upper second grid points
-    for x in range(GRID_X2E, GRID_X3 + 1, int(cell_size)):
-        for y in range(GRID_Y1, GRID_Y2 + 1, int(cell_size)):
-            points.append((x, y))
-    # Lower grid points
-    for x in range(GRID_X1, GRID_X2 + 1, int(cell_size)):
-        for y in range(GRID_Y3, GRID_Y4 + 1, int(cell_size)):
-            points.append((x, y))
-    # Lower second grid points
-    for x in range(GRID_X2E, GRID_X3 + 1, int(cell_size)):
-        for y in range(GRID_Y3, GRID_Y4 + 1, int(cell_size)):
-            points.append((x, y))
-    # Power rails
-    for i in range(0, 5):
-        k = 116 * i
-        for x in range(X1_RAIL + k, X2_RAIL + k + 1, int(cell_size)):
-            for y in [Y1_UP_RAIL, Y2_UP_RAIL, Y1_DOWN_RAIL, Y2_DOWN_RAIL]:
-                points.append((x, y))
-        for x in range(X3_RAIL + k, X4_RAIL + k + 1, int(cell_size)):
-            for y in [Y1_UP_RAIL, Y2_UP_RAIL, Y1_DOWN_RAIL, Y2_DOWN_RAIL]:
-                points.append((x, y))
-    return points
-
 # Get all valid grid points
-grid_points = get_grid_points()
+grid_points = list(HOLE_POS)
 wires = []  # Track all wires
+# Keeps nets and gate outputs up to date as the circuit is edited
+engine = IncrementalEngine(point_index, vcc_pos, gnd_pos, powered_points, grounded_points,
+                           unknown_points, floating_points, conflict_points)
+engine.add_terminals(output_circles)
+output_circle_ids = [point_index.get(circle_pos) for circle_pos in output_circles]
+reported_conflicts = set()
+
+def report_conflicts():
+    """Print shorts and contention that appeared since the last edit"""
+    global reported_conflicts
+    found = engine.conflicts()
+    current = {str(conflict) for conflict in found}
+    for conflict in found:
+        if str(conflict) not in reported_conflicts:
+            print(f"Warning: {conflict}")
+    reported_conflicts = current
+
+# Screen areas to push this frame, and the point states they were drawn from
+dirty = DirtyRegions((WINDOW_WIDTH, WINDOW_HEIGHT))
+power_watcher = PowerWatcher([powered_points, grounded_points, unknown_points, floating_points,
+                              conflict_points])
+frame_clock = pygame.time.Clock()
+
+def mark_power_changes():
+    """Mark every point whose state changed, and the components drawn from it"""
+    changed = set(power_watcher.changed_points())
+    if not changed:
+        return
+    for point in changed:
+        dirty.mark_point(point)
+    for component in placed_gates + placed_leds:
+        if not changed.isdisjoint(component_points(component)):
+            dirty.mark_component(component)
+
+def mark_dragging():
+    """Mark the component being dragged out of a palette, if any, and its snap rings"""
+    if led_palette.dragging_led:
+        dirty.mark_component(led_palette.dragging_led.led)
+    for palette in gate_palettes:
+        if palette.dragging_gate:
+            dirty.mark_component(palette.dragging_gate.gate)
+            dirty.mark_snap_preview(palette.snap_preview)
+
+def is_animating():
+    """Whether the screen can change without an input event"""
+    return input_manager.clock.running
+
+# Everything a click can attach a wire to, bucketed for O(1) hit-testing
+anchors = SpatialHash()
+for point in grid_points:
+    anchors.add(point, HOLE)
+for circle_pos in output_circles:
+    anchors.add(circle_pos, OUTPUT)
+anchors.add(vcc_pos, SUPPLY)
+anchors.add(gnd_pos, SUPPLY)
+for switch in input_manager.sources():
+    anchors.add(switch.output_pos, SWITCH_OUTPUT, switch)
+
+def place_led(led):
+    placed_leds.append(led)
+    anchors.add_component(led, LED_TERMINAL)
+    engine.add_terminals([led.anode_pos, led.cathode_pos])
+    dirty.mark_component(led)
+
+def add_wire(start, end):
+    """Add a wire and update only the nets it touches"""
+    wires.append((start, end))
+    dirty.mark_line(start, end)
+    engine.add_wire(start, end)
+    report_conflicts()
+
+def place_gate(gate):
+    placed_gates.append(gate)
+    anchors.add_component(gate, PIN)
+    dirty.mark_component(gate)
+    engine.add_gate(gate)
+    report_conflicts()
+
+def sync_switches():
+    for switch in input_manager.sources():
+        engine.set_source(switch.output_pos, switch.is_on)
+    report_conflicts()
+
+sync_switches()
+
+# Waveform recording of switches and outputs, in milliseconds of wall time
+recorder = None
+if args.vcd:
+    recorder = VCDWriter(args.vcd, [f"IN{i+1}" for i in range(len(input_manager.switches))] + ["CLK"] +
+                         [f"OUT{i+1}" for i in range(len(output_circles))], timescale='1ms')
+
+def record_waveform():
+    now = pygame.time.get_ticks()
+    for i, switch in enumerate(input_manager.switches):
+        recorder.change(now, f"IN{i+1}", switch.is_on)
+    recorder.change(now, "CLK", input_manager.clock.is_on)
+    # Outputs keep their X and Z levels rather than reading as 0
+    for i, circle_id in enumerate(output_circle_ids):
+        recorder.change(now, f"OUT{i+1}", level_of_id(circle_id))
+
 # Main loop
 running = True
 start_point = None
+preview_end = None  # Mouse position the preview wire was last drawn to
 
 # Initialize circuit from JSON if provided
 if args.circuit_json:
     converter = CircuitConverter()
     new_gates, new_wires = converter.setup_circuit(args.circuit_json)
-    placed_gates.extend(new_gates.values())
-    wires.extend(new_wires)
+    for gate in new_gates.values():
+        place_gate(gate)
+    for start, end in new_wires:
+        add_wire(start, end)
 
 while running:
-    for event in pygame.event.get():
+    clock_source = input_manager.clock
+    if clock_source.tick(pygame.time.get_ticks()):
+        engine.set_source(clock_source.output_pos, clock_source.is_on)
+        dirty.mark_switch(clock_source)
+
+    # Idle: sleep until the next input event when nothing is animating
+    if args.no_idle or is_animating() or dirty:
+        events = pygame.event.get()
+    else:
+        events = [pygame.event.wait()] + pygame.event.get()
+
+    for event in events:
         if event.type == pygame.QUIT:
             running = False
             
@@ -150,15 +220,32 @@ while running:
                 grounded_points.clear()
                 reset_powered_state(window)
                 wires.clear()
+                for component in placed_leds + placed_gates:
+                    anchors.remove_owner(component)
                 placed_leds.clear()
                 placed_gates.clear()
-                output_colors = [(255, 255, 0)] * 9
+                engine.reset()
+                reported_conflicts = set()
+                sync_switches()
+                dirty.mark_all()
+            elif event.key == pygame.K_t:
+                # Print the full truth table of the board instead of clicking every switch
+                board = Circuit.from_board(placed_gates, wires,
+                                           [switch.output_pos for switch in input_manager.switches],
+                                           output_circles, vcc_pos, gnd_pos)
+                print(truth_table(board).format())
 
         if event.type == pygame.MOUSEBUTTONDOWN:
             mouse_pos = pygame.mouse.get_pos()
+            if start_point and preview_end:
+                dirty.mark_line(start_point, preview_end)
+            preview_end = mouse_pos
 
             # Check for input switch toggles first
             if input_manager.handle_click(mouse_pos):
+                for source in input_manager.sources():
+                    dirty.mark_switch(source)
+                sync_switches()
                 continue
 
             # Check for palette clicks
@@ -182,96 +269,22 @@ while running:
                 continue
 
 
-            # Check if clicking on gate pins 
-            gate_pin_clicked = False
-            for gate in placed_gates:
-                # Check if it's a NOT gate (has only 4 pins) or other type
-                pin_names = ['vcc', 'input1', 'output', 'gnd'] if isinstance(gate, NotGate) else ['vcc', 'input1', 'input2', 'output', 'gnd']
-                
-                for pin_name in pin_names:
-                    pin_pos = getattr(gate, f"{pin_name}_pos")
-                    if is_mouse_near_point(mouse_pos, pin_pos):
-                        if start_point is None:
-                            start_point = pin_pos
-                        else:
-                            wires.append((start_point, pin_pos))
-                            start_point = None
-                        gate_pin_clicked = True
-                        break
-                if gate_pin_clicked:
-                    break
-            if gate_pin_clicked:
-                continue
-
-            # Check if clicking on LED terminals
-            led_terminal_clicked = False
-            for led in placed_leds:
-                if is_mouse_near_point(mouse_pos, led.anode_pos):
-                    if start_point is None:
-                        start_point = led.anode_pos
-                    else:
-                        wires.append((start_point, led.anode_pos))
-                        start_point = None
-                    led_terminal_clicked = True
-                    break
-                elif is_mouse_near_point(mouse_pos, led.cathode_pos):
-                    if start_point is None:
-                        start_point = led.cathode_pos
-                    else:
-                        wires.append((start_point, led.cathode_pos))
-                        start_point = None
-                    led_terminal_clicked = True
-                    break
-            if led_terminal_clicked:
-                continue
-
-            # Check for input switch connection points
-            switch = input_manager.get_switch_at_pos(mouse_pos)
-            if switch:
-                if start_point is None:
-                    start_point = switch.output_pos
-                else:
-                    wires.append((start_point, switch.output_pos))
-                    start_point = None
-                continue
-            
-            # Check VCC and GND
-            if is_mouse_near_point(mouse_pos, vcc_pos):
-                if start_point is None:
-                    start_point = vcc_pos
-                else:
-                    wires.append((start_point, vcc_pos))
-                    start_point = None
-                continue
-            elif is_mouse_near_point(mouse_pos, gnd_pos):
+            # Gate pins, LED terminals, switch outputs, VCC/GND, outputs and
+            # holes, in that priority, the nearest one within reach
+            anchor = anchors.query(mouse_pos)
+            if anchor is not None:
                 if start_point is None:
-                    start_point = gnd_pos
+                    start_point = anchor.point
                 else:
-                    wires.append((start_point, gnd_pos))
+                    add_wire(start_point, anchor.point)
                     start_point = None
-                continue
-            
-            # Check outputs
-            for circle_pos in output_circles:
-                if is_mouse_near_point(mouse_pos, circle_pos):
-                    if start_point is None:
-                        start_point = circle_pos
-                    else:
-                        wires.append((start_point, circle_pos))
-                        start_point = None
-                    break
-            
-            # Check grid points
-            for point in grid_points:
-                if is_mouse_near_point(mouse_pos, point):
-                    if start_point is None:
-                        start_point = point
-                    else:
-                        wires.append((start_point, point))
-                        start_point = None
-                    break
 
         if event.type == pygame.MOUSEMOTION:
+            if start_point:
+                dirty.mark_line(start_point, preview_end or start_point)
+                preview_end = pygame.mouse.get_pos()
+                dirty.mark_line(start_point, preview_end)
+            mark_dragging()
             if led_palette.dragging_led:
                 led_palette.handle_drag(pygame.mouse.get_pos())
             elif and_gate_palette.dragging_gate:
@@ -284,39 +297,50 @@ while running:
                 not_gate_palette.handle_drag(pygame.mouse.get_pos())
             elif nand_gate_palette.dragging_gate:  # Add this
                 nand_gate_palette.handle_drag(pygame.mouse.get_pos())
+            mark_dragging()
 
         if event.type == pygame.MOUSEBUTTONUP:
+            mark_dragging()
             if led_palette.dragging_led:
                 new_led = led_palette.handle_release()
                 if new_led:
-                    placed_leds.append(new_led)
+                    place_led(new_led)
             elif and_gate_palette.dragging_gate:
-                new_gate = and_gate_palette.handle_release(grid_points)
+                new_gate = and_gate_palette.handle_release()
                 if new_gate:
-                    placed_gates.append(new_gate)
+                    place_gate(new_gate)
 
             elif or_gate_palette.dragging_gate:  # Add this
-                new_gate = or_gate_palette.handle_release(grid_points)
+                new_gate = or_gate_palette.handle_release()
                 if new_gate:
-                    placed_gates.append(new_gate)
+                    place_gate(new_gate)
 
             elif nor_gate_palette.dragging_gate:  # Add this
-                new_gate = nor_gate_palette.handle_release(grid_points)
+                new_gate = nor_gate_palette.handle_release()
                 if new_gate:
-                    placed_gates.append(new_gate)
+                    place_gate(new_gate)
 
             elif not_gate_palette.dragging_gate:  # Add this
-                new_gate = not_gate_palette.handle_release(grid_points)
+                new_gate = not_gate_palette.handle_release()
                 if new_gate:
-                    placed_gates.append(new_gate)
+                    place_gate(new_gate)
 
             elif nand_gate_palette.dragging_gate:
-                new_gate = nand_gate_palette.handle_release(grid_points)
+                new_gate = nand_gate_palette.handle_release()
                 if new_gate:
-                    placed_gates.append(new_gate)
+                    place_gate(new_gate)
 
-    # Clear window
-    window.fill(WHITE)
+    mark_power_changes()
+    if recorder:
+        record_waveform()
+    if args.render == 'full':
+        dirty.mark_all()
+    if not dirty:
+        frame_clock.tick(args.fps)
+        continue
+
+    # Clear window to the pre-rendered unpowered board
+    render_background(window)
 
     # Draw background if available
     #if background_image:
@@ -324,32 +348,18 @@ while running:
         #image_rect.center = (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
         #window.blit(background_image, image_rect)
 
-    # Update power state
-    powered_points = set()
-    powered_inputs = input_manager.get_powered_points()
-    powered_points, grounded_points = propagate_power(
-    wires, 
-    vcc_pos, 
-    gnd_pos, 
-    output_circles, 
-    placed_gates,
-    input_manager  # Pass the instance
-)
-    powered_points.update(powered_inputs)
-
     # Draw VCC and GND
     pygame.draw.circle(window, VCC_COLOR, vcc_pos, 10)
     pygame.draw.circle(window, GND_COLOR, gnd_pos, 10)
 
     # Draw labels
-    font = pygame.font.Font(None, 36)
-    vcc_text = font.render("VCC", True, BLACK)
-    gnd_text = font.render("GND", True, BLACK)
+    vcc_text = render_text("VCC", 36, BLACK)
+    gnd_text = render_text("GND", 36, BLACK)
     window.blit(vcc_text, (vcc_pos[0] + 20, vcc_pos[1] - 10))
     window.blit(gnd_text, (gnd_pos[0] + 20, gnd_pos[1] - 10))
 
     # Draw components and wires
-    render_powered_state(window, output_circles)
+    render_powered_state(window, output_circles, output_circle_ids)
     
     # Draw wires first (so they appear behind components)
     for start, end in wires:
@@ -357,7 +367,7 @@ while running:
 
     # Draw preview wire
     if start_point:
-        pygame.draw.line(window, WIRE_COLOR, start_point, pygame.mouse.get_pos(), 4)
+        pygame.draw.line(window, WIRE_COLOR, start_point, preview_end or start_point, 4)
 
     # Draw inputs
     input_manager.draw(window)
@@ -376,7 +386,10 @@ while running:
     for gate in placed_gates:
         gate.draw(window, powered_points, grounded_points, vcc_pos, gnd_pos)
 
-    pygame.display.flip()
+    dirty.flush()
+    frame_clock.tick(args.fps)
 
+if recorder:
+    recorder.close()
 pygame.quit()
 
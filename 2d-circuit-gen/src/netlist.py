@@ -0,0 +1,465 @@
+# netlist.py
+import warnings
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from geometry import STRIP_HOLES, PointIndex
+
+# Pin attribute prefixes shared by every gate class (NotGate has no input2)
+GATE_PIN_NAMES = ['vcc', 'input1', 'input2', 'output', 'gnd']
+
+
+class DisjointSet:
+    """Union-find over dense integer IDs with path halving and union by size"""
+
+    def __init__(self, size: int = 0):
+        self.parent: List[int] = list(range(size))
+        self.size: List[int] = [1] * size
+
+    def grow(self, size: int):
+        """Make sure IDs below size exist, each new one in its own set"""
+        for item in range(len(self.parent), size):
+            self.parent.append(item)
+            self.size.append(1)
+
+    def find(self, item: int) -> int:
+        """Return the representative of the set containing item"""
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> int:
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+    def groups(self) -> Dict[int, List[int]]:
+        """Map every root to the list of items in its set"""
+        result: Dict[int, List[int]] = {}
+        for item in range(len(self.parent)):
+            result.setdefault(self.find(item), []).append(item)
+        return result
+
+
+class Netlist:
+    """Electrical nets of a board: every point ID belongs to exactly one net"""
+
+    def __init__(self, nets: DisjointSet, index: PointIndex):
+        self.nets = nets
+        self.index = index
+        self.members = nets.groups()
+
+    def net_of(self, point) -> Optional[int]:
+        point_id = self.index.get(point)
+        if point_id is None or point_id >= len(self.nets.parent):
+            return None
+        return self.nets.find(point_id)
+
+    def ids_of(self, net) -> List[int]:
+        return self.members.get(net, [])
+
+
+class Conflict:
+    """A net that is shorted or fought over by more than one driver.
+
+    kind is 'short' when VCC and GND share the net, otherwise 'contention'
+    (two gate outputs tied together, or a gate output tied to a source).
+    wires and gates are the indices of the wires and gates on the net.
+    """
+
+    def __init__(self, kind: str, net: int, wires: List[int], gates: List[int]):
+        self.kind = kind
+        self.net = net
+        self.wires = wires
+        self.gates = gates
+
+    def __repr__(self) -> str:
+        return f"Conflict({self.kind!r}, net={self.net}, wires={self.wires}, gates={self.gates})"
+
+    def __str__(self) -> str:
+        what = "VCC shorted to GND" if self.kind == 'short' else "Output contention"
+        return f"{what}: wires {self.wires}, gates {self.gates}"
+
+
+def is_conflict(high: int, low: int, drivers: int, gate_drivers: int) -> bool:
+    """Whether a net with these driver counts is a short or contention.
+
+    A single driver never conflicts with itself, even when it outputs X.
+    """
+    return drivers > 1 and bool((high and low) or gate_drivers)
+
+
+def gate_pins(gate) -> Iterable[Tuple[str, Optional[tuple], Optional[tuple]]]:
+    """Yield (pin_name, pin_pos, grid_connection) for every pin the gate has"""
+    for pin_name in GATE_PIN_NAMES:
+        pin_pos = getattr(gate, f"{pin_name}_pos", None)
+        if pin_pos is None:
+            continue
+        yield pin_name, pin_pos, getattr(gate, f"{pin_name}_connection", None)
+
+
+def compile_nets(wires, placed_gates, index: PointIndex, terminals=(), strips=STRIP_HOLES) -> Netlist:
+    """Merge wires, gate pin legs and breadboard strips into nets.
+
+    strips are groups of hole IDs that are internally connected (column
+    strips and power rails). terminals are loose points such as VCC, GND,
+    switch outputs and output circles that should get a net even when
+    nothing is wired to them yet.
+    """
+    for point in terminals:
+        if point is not None:
+            index.id_of(point)
+
+    # A placed gate's pin leg sits in the hole it snapped to
+    legs = []
+    for gate in placed_gates:
+        for _, pin_pos, connection in gate_pins(gate):
+            pin_id = index.id_of(pin_pos)
+            if connection is not None:
+                legs.append((pin_id, index.id_of(connection)))
+
+    links = [(index.id_of(start), index.id_of(end)) for start, end in wires]
+
+    nets = DisjointSet(len(index))
+    for strip in strips:
+        first = strip[0]
+        for hole_id in strip[1:]:
+            nets.union(first, hole_id)
+    for a, b in legs:
+        nets.union(a, b)
+    for a, b in links:
+        nets.union(a, b)
+
+    return Netlist(nets, index)
+
+
+# Gate logic over ints: plain 0/1 values or packed bit vectors where ones is
+# the all-ones mask of the word width.
+GATE_LOGIC = {
+    'AND': lambda a, b, ones: a & b,
+    'OR': lambda a, b, ones: a | b,
+    'NAND': lambda a, b, ones: (a & b) ^ ones,
+    'NOR': lambda a, b, ones: (a | b) ^ ones,
+    'NOT': lambda a, ones: a ^ ones,
+}
+
+# Four-valued logic as two bit planes (high, low): a bit is set in high when
+# something drives the net to 1 and in low when something drives it to 0.
+# Like GATE_LOGIC this works bitwise, on single values or packed vectors.
+LOGIC_0 = (0, 1)
+LOGIC_1 = (1, 0)
+LOGIC_X = (1, 1)  # Driven both ways or unknown
+LOGIC_Z = (0, 0)  # Not driven
+LEVEL_NAMES = {LOGIC_0: '0', LOGIC_1: '1', LOGIC_X: 'X', LOGIC_Z: 'Z'}
+
+# Inputs are (high, low) pairs with Z already read as X
+GATE_LOGIC4 = {
+    'AND': lambda a, b, ones: (a[0] & b[0], a[1] | b[1]),
+    'OR': lambda a, b, ones: (a[0] | b[0], a[1] & b[1]),
+    'NAND': lambda a, b, ones: (a[1] | b[1], a[0] & b[0]),
+    'NOR': lambda a, b, ones: (a[1] & b[1], a[0] | b[0]),
+    'NOT': lambda a, ones: (a[1], a[0]),
+}
+
+
+def level_name(value: Tuple[int, int]) -> str:
+    """'0', '1', 'X' or 'Z' for a single-bit (high, low) pair"""
+    return LEVEL_NAMES[(value[0] & 1, value[1] & 1)]
+
+
+# Cyclic gate groups (latches, ring oscillators) are relaxed at most this
+# many times before the last values are kept.
+MAX_FIXPOINT_ITERATIONS = 64
+
+
+class UnsettledWarning(RuntimeWarning):
+    """A feedback loop was still changing when evaluation gave up on it"""
+
+
+def warn_unsettled(message: str = "feedback loop did not settle, keeping last values"):
+    """Issue an UnsettledWarning.
+
+    Always raised from this one place, so Python's default warning filter
+    shows it once per process however many evaluations hit it; callers that
+    need to act on it can turn it into an error with warnings.filterwarnings.
+    """
+    warnings.warn(message, UnsettledWarning)
+
+
+class CompiledGate:
+    """A gate reduced to net IDs: output = logic(inputs) while powered"""
+
+    __slots__ = ('gate', 'kind', 'inputs', 'output', 'power', 'grounded', 'level')
+
+    def __init__(self, gate, kind: str, inputs: Tuple[int, ...], output: int,
+                 power: Optional[int], grounded: bool):
+        self.gate = gate
+        self.kind = kind
+        self.inputs = inputs
+        self.output = output
+        self.power = power        # Net feeding the VCC pin, None for ideal power
+        self.grounded = grounded  # Whether the GND pin reaches ground
+        self.level = 0
+
+
+def gate_label(gate: CompiledGate, index: int) -> str:
+    """Name of a compiled gate for reports: its own name, else kind and position"""
+    return getattr(gate.gate, 'name', None) or f"{gate.kind}{index + 1}"
+
+
+class GateNetwork:
+    """Gates compiled into a levelized DAG of strongly connected components.
+
+    schedule lists the components in topological order; a component with
+    more than one gate (or a gate feeding itself) is a feedback loop that
+    evaluate() relaxes to a fixed point.
+    """
+
+    def __init__(self, gates: List[CompiledGate]):
+        self.gates = gates
+        self.drivers: Dict[int, List[int]] = {}
+        for gate_index, gate in enumerate(gates):
+            self.drivers.setdefault(gate.output, []).append(gate_index)
+
+        self.fanin: List[List[int]] = []
+        for gate in gates:
+            reads = list(gate.inputs)
+            if gate.power is not None:
+                reads.append(gate.power)
+            self.fanin.append(sorted({driver for net in reads for driver in self.drivers.get(net, ())}))
+
+        self.schedule = self._levelize()
+
+    def cone(self, nets: Iterable[int]) -> List[int]:
+        """Indices of the gates in the transitive fan-in of nets, ascending"""
+        seen: Set[int] = set()
+        work = [driver for net in nets for driver in self.drivers.get(net, ())]
+        while work:
+            gate_index = work.pop()
+            if gate_index not in seen:
+                seen.add(gate_index)
+                work.extend(self.fanin[gate_index])
+        return sorted(seen)
+
+    def subnetwork(self, gate_indices: Sequence[int]) -> 'GateNetwork':
+        """A network of copies of the given gates, relevelized on its own"""
+        return GateNetwork([CompiledGate(gate.gate, gate.kind, gate.inputs, gate.output,
+                                         gate.power, gate.grounded)
+                            for gate in (self.gates[i] for i in gate_indices)])
+
+    def _levelize(self) -> List[List[int]]:
+        """Tarjan's SCC algorithm, iterative, emitting components in topological order"""
+        count = len(self.gates)
+        order = [-1] * count
+        low = [0] * count
+        on_stack = [False] * count
+        stack: List[int] = []
+        components: List[List[int]] = []
+        counter = 0
+
+        for start in range(count):
+            if order[start] != -1:
+                continue
+            work = [(start, 0)]
+            while work:
+                node, child = work.pop()
+                if child == 0:
+                    order[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                fanin = self.fanin[node]
+                if child < len(fanin):
+                    work.append((node, child + 1))
+                    pred = fanin[child]
+                    if order[pred] == -1:
+                        work.append((pred, 0))
+                    elif on_stack[pred]:
+                        low[node] = min(low[node], order[pred])
+                    continue
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+
+        # Tarjan over fan-in edges emits predecessors first
+        for component in components:
+            members = set(component)
+            level = 1 + max((self.gates[pred].level for member in component
+                             for pred in self.fanin[member] if pred not in members), default=-1)
+            for member in component:
+                self.gates[member].level = level
+        return components
+
+    def is_cyclic(self, component: List[int]) -> bool:
+        return len(component) > 1 or component[0] in self.fanin[component[0]]
+
+    def evaluate(self, sources: Dict[int, int], ones: int = 1,
+                 state: Optional[List[int]] = None) -> Dict[int, int]:
+        """Settle every gate once in level order and return net values.
+
+        sources maps driven nets (VCC, switches) to their value; gate outputs
+        are OR-ed onto their nets like wired connections on the board. state,
+        if given, holds every gate's output from the previous call and is
+        updated in place, so latches and flip-flops keep their value.
+        """
+        values = dict(sources)
+        outputs = state if state is not None else [0] * len(self.gates)
+
+        def gate_value(gate: CompiledGate) -> int:
+            if not gate.grounded:
+                return 0
+            result = GATE_LOGIC[gate.kind](*[values.get(net, 0) for net in gate.inputs], ones)
+            if gate.power is not None:
+                result &= values.get(gate.power, 0)
+            return result
+
+        def net_value(net: int) -> int:
+            result = sources.get(net, 0)
+            for driver in self.drivers[net]:
+                result |= outputs[driver]
+            return result
+
+        if state is not None:
+            for net in self.drivers:
+                values[net] = net_value(net)
+        self._settle(values, outputs, gate_value, net_value)
+        return values
+
+    def evaluate_faults(self, sources: Dict[int, int], ones: int,
+                        masks: Dict[int, Dict[int, Tuple[int, int]]]) -> Dict[int, int]:
+        """evaluate() with stuck-at faults injected per bit lane.
+
+        masks maps a gate index to {pin slot: (clear, set)}, where slot k is
+        the gate's k-th input and -1 its output; lanes in clear read or drive
+        0 on that pin and lanes in set read or drive 1.
+        """
+        values = dict(sources)
+        outputs = [0] * len(self.gates)
+        injected = {self.gates[gate_index]: pins for gate_index, pins in masks.items()}
+
+        def gate_value(gate: CompiledGate) -> int:
+            pins = injected.get(gate)
+            if pins is None:
+                operands = [values.get(net, 0) for net in gate.inputs]
+            else:
+                operands = []
+                for slot, net in enumerate(gate.inputs):
+                    clear, set_ = pins.get(slot, (0, 0))
+                    operands.append((values.get(net, 0) & ~clear) | set_)
+            if not gate.grounded:
+                result = 0
+            else:
+                result = GATE_LOGIC[gate.kind](*operands, ones)
+                if gate.power is not None:
+                    result &= values.get(gate.power, 0)
+            if pins is not None and -1 in pins:
+                clear, set_ = pins[-1]
+                result = (result & ~clear) | set_
+            return result
+
+        def net_value(net: int) -> int:
+            result = sources.get(net, 0)
+            for driver in self.drivers[net]:
+                result |= outputs[driver]
+            return result
+
+        self._settle(values, outputs, gate_value, net_value)
+        return values
+
+    def evaluate4(self, sources: Dict[int, Tuple[int, int]], ones: int = 1,
+                  state: Optional[List[Tuple[int, int]]] = None) -> Dict[int, Tuple[int, int]]:
+        """Four-valued evaluate(): every net value is a (high, low) plane pair.
+
+        sources also carry drive low (GND, switches that are off). A net
+        driven both ways resolves to X and an undriven net to Z; gates read Z
+        as X. A gate whose VCC net is not 1 drives nothing (X if it is X).
+        """
+        values = dict(sources)
+        outputs = state if state is not None else [LOGIC_Z] * len(self.gates)
+
+        def read(net: int) -> Tuple[int, int]:
+            high, low = values.get(net, LOGIC_Z)
+            floating = ones & ~(high | low)
+            return high | floating, low | floating
+
+        def gate_value(gate: CompiledGate) -> Tuple[int, int]:
+            if not gate.grounded:
+                return LOGIC_Z
+            high, low = GATE_LOGIC4[gate.kind](*[read(net) for net in gate.inputs], ones)
+            if gate.power is not None:
+                power_high, power_low = values.get(gate.power, LOGIC_Z)
+                on = power_high & ~power_low
+                unknown = power_high & power_low
+                high, low = (high & on) | unknown, (low & on) | unknown
+            return high, low
+
+        def net_value(net: int) -> Tuple[int, int]:
+            high, low = sources.get(net, LOGIC_Z)
+            for driver in self.drivers[net]:
+                high |= outputs[driver][0]
+                low |= outputs[driver][1]
+            return high, low
+
+        if state is not None:
+            for net in self.drivers:
+                values[net] = net_value(net)
+        self._settle(values, outputs, gate_value, net_value)
+        return values
+
+    def _settle(self, values: dict, outputs: list, gate_value, net_value):
+        """Run the schedule: acyclic gates once, feedback loops to a fixed point"""
+        gates = self.gates
+        for component in self.schedule:
+            if not self.is_cyclic(component):
+                gate_index = component[0]
+                outputs[gate_index] = gate_value(gates[gate_index])
+                values[gates[gate_index].output] = net_value(gates[gate_index].output)
+                continue
+            # Feedback loop: Gauss-Seidel relaxation until nothing changes
+            for _ in range(MAX_FIXPOINT_ITERATIONS):
+                changed = False
+                for gate_index in component:
+                    result = gate_value(gates[gate_index])
+                    if result != outputs[gate_index]:
+                        outputs[gate_index] = result
+                        values[gates[gate_index].output] = net_value(gates[gate_index].output)
+                        changed = True
+                if not changed:
+                    break
+            else:
+                warn_unsettled()
+
+
+def compile_gates(netlist: Netlist, placed_gates, ground_net: Optional[int],
+                  ideal_power: bool = False) -> GateNetwork:
+    """Compile placed gates into a levelized network over the nets of netlist.
+
+    With ideal_power the VCC and GND pins are ignored and every gate runs.
+    """
+    compiled = []
+    for gate in placed_gates:
+        pins = {pin_name: netlist.net_of(pin_pos) for pin_name, pin_pos, _ in gate_pins(gate)}
+        inputs = tuple(pins[name] for name in ('input1', 'input2') if name in pins)
+        if ideal_power:
+            power, grounded = None, True
+        else:
+            power = pins.get('vcc')
+            grounded = ground_net is not None and pins.get('gnd') == ground_net
+        compiled.append(CompiledGate(gate, gate.kind, inputs, pins['output'], power, grounded))
+    return GateNetwork(compiled)
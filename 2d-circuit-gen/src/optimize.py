@@ -0,0 +1,189 @@
+# optimize.py
+import copy
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from netlist import CompiledGate, GateNetwork, gate_label
+from simulator import Circuit, CompiledCircuit
+
+# Netlist clean-up run before simulation: constant folding, double-inverter
+# and buffer collapse, and removal of gates that cannot reach an output.
+# The optimized circuit has the same inputs and outputs and the same
+# two-valued behaviour, so truth tables, batches and sweeps can run on it
+# unchanged. Four-valued checks (X/Z levels, conflicts) should keep using
+# the original circuit, since folding turns floating nets into plain 0s.
+
+# Controlling input value of each two-input gate and the output it forces
+CONTROLLING = {'AND': (0, 0), 'OR': (1, 1), 'NAND': (0, 1), 'NOR': (1, 0)}
+INVERTING = {'AND': False, 'OR': False, 'NAND': True, 'NOR': True}
+
+
+class OptimizationReport:
+    """What optimize() removed, by gate name"""
+
+    def __init__(self, gates_before: int):
+        self.gates_before = gates_before
+        self.gates_after = gates_before
+        self.folded: List[str] = []     # Gates replaced by a constant
+        self.simplified: List[str] = [] # Gates reduced to a NOT or a plain wire
+        self.collapsed: List[str] = []  # NOT-NOT pairs bypassed
+        self.dead: List[str] = []       # Gates whose output reaches no output
+
+    @property
+    def removed(self) -> int:
+        return self.gates_before - self.gates_after
+
+    def format(self) -> str:
+        lines = [f"Optimized {self.gates_before} gates to {self.gates_after}"]
+        for title, names in (("Folded to constants", self.folded), ("Simplified", self.simplified),
+                             ("Collapsed NOT-NOT pairs", self.collapsed), ("Dead", self.dead)):
+            if names:
+                lines.append(f"{title}: {', '.join(names)}")
+        return "\n".join(lines)
+
+
+def optimize(circuit: Union[Circuit, CompiledCircuit]) -> Tuple[CompiledCircuit, OptimizationReport]:
+    """Fold constants, collapse NOT-NOT pairs and buffers, drop dead gates.
+
+    Returns the optimized compiled circuit and a report of the changes.
+    """
+    compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile()
+    network = compiled.network
+    report = OptimizationReport(len(network.gates))
+    names = [gate_label(gate, index) for gate, index in zip(network.gates, compiled.gate_indices)]
+    cyclic = {gate_index for component in network.schedule if network.is_cyclic(component)
+              for gate_index in component}
+    # A feedback loop relaxes from its power-on state, so what it latches can hang
+    # on the order its gates settle in and on every transient value fed into it.
+    # The loops and their whole fan-in are kept exactly as they are.
+    frozen = set(network.cone(network.gates[gate_index].output for gate_index in cyclic))
+
+    # Working copies in schedule order, so constants flow forward in one pass
+    gates: Dict[int, CompiledGate] = {}
+    for component in network.schedule:
+        for gate_index in component:
+            gate = network.gates[gate_index]
+            gates[gate_index] = CompiledGate(gate.gate, gate.kind, gate.inputs, gate.output,
+                                             gate.power, gate.grounded)
+    tied = set(compiled.tied_high)
+    if compiled.vcc_net is not None:
+        tied.add(compiled.vcc_net)
+    input_nets = {net for net in compiled.input_nets.values() if net is not None}
+    output_nets = {name: net for name, net in compiled.output_nets.items()}
+    alias: Dict[int, int] = {}
+    drivers: Dict[int, Set[int]] = {}
+    for gate_index, gate in gates.items():
+        drivers.setdefault(gate.output, set()).add(gate_index)
+
+    def find(net: Optional[int]) -> Optional[int]:
+        while net in alias:
+            net = alias[net]
+        return net
+
+    def drivers_of(net: int) -> List[int]:
+        return sorted(drivers.get(net, ()))
+
+    def value_of(net: Optional[int]) -> Optional[int]:
+        """1 or 0 for a net with a known constant value, None if it varies"""
+        net = find(net)
+        if net in tied:
+            return 1
+        if net in input_nets or drivers.get(net):
+            return None
+        return 0
+
+    def can_alias(gate_index: int, target: int) -> bool:
+        """Whether the gate's output net may be replaced by target"""
+        out = gates[gate_index].output
+        return (out != target and out not in input_nets
+                and out not in tied and drivers_of(out) == [gate_index])
+
+    def remove(gate_index: int):
+        drivers[gates.pop(gate_index).output].discard(gate_index)
+
+    changed = True
+    while changed:
+        changed = False
+        for gate_index in list(gates):
+            if gate_index not in gates or gate_index in frozen:
+                continue
+            gate = gates[gate_index]
+            gate.inputs = tuple(find(net) for net in gate.inputs)
+            power = value_of(gate.power) if gate.power is not None else 1
+            operands = [value_of(net) for net in gate.inputs]
+
+            # Constant output: unpowered, controlled, or all inputs known
+            result = None
+            if not gate.grounded or power == 0:
+                result = 0
+            elif gate.kind == 'NOT':
+                if operands[0] is not None:
+                    result = operands[0] ^ 1
+            else:
+                control, forced = CONTROLLING[gate.kind]
+                if control in operands:
+                    result = forced
+                elif None not in operands:
+                    result = forced ^ 1
+            if result is not None and (result == 0 or power == 1):
+                remove(gate_index)
+                if result:
+                    tied.add(gate.output)
+                    for driver in drivers_of(gate.output):
+                        remove(driver)
+                        report.dead.append(names[driver])
+                report.folded.append(f"{names[gate_index]}={result}")
+                changed = True
+                continue
+            if power != 1:
+                continue
+
+            # One input at its non-controlling value: a NOT or a plain wire
+            if gate.kind != 'NOT' and operands.count(None) == 1:
+                other = gate.inputs[operands.index(None)]
+                if INVERTING[gate.kind]:
+                    gate.kind = 'NOT'
+                    gate.inputs = (other,)
+                    report.simplified.append(f"{names[gate_index]}->NOT")
+                    changed = True
+                elif can_alias(gate_index, other):
+                    alias[gate.output] = other
+                    remove(gate_index)
+                    report.simplified.append(f"{names[gate_index]}->wire")
+                    changed = True
+                continue
+
+            # NOT fed only by another powered NOT: read the first NOT's input
+            if gate.kind == 'NOT':
+                feeders = drivers_of(gate.inputs[0])
+                if len(feeders) != 1 or gate.inputs[0] in input_nets or feeders[0] in cyclic:
+                    continue
+                first = gates[feeders[0]]
+                first_power = value_of(first.power) if first.power is not None else 1
+                source = find(first.inputs[0])
+                if first.kind == 'NOT' and first.grounded and first_power == 1 \
+                        and can_alias(gate_index, source):
+                    alias[gate.output] = source
+                    remove(gate_index)
+                    report.collapsed.append(f"{names[feeders[0]]}/{names[gate_index]}")
+                    changed = True
+
+    # Dead gates: everything outside the fan-in cone of the outputs
+    for name in output_nets:
+        output_nets[name] = find(output_nets[name])
+    kept = sorted(gates)
+    for gate in gates.values():
+        gate.inputs = tuple(find(net) for net in gate.inputs)
+        gate.power = find(gate.power)
+    live = GateNetwork([gates[gate_index] for gate_index in kept])
+    cone = live.cone(net for net in output_nets.values() if net is not None)
+    reached = set(cone)
+    report.dead.extend(names[gate_index] for i, gate_index in enumerate(kept) if i not in reached)
+
+    optimized = copy.copy(compiled)
+    optimized.network = live.subnetwork(cone)
+    optimized.gate_indices = [compiled.gate_indices[kept[i]] for i in cone]
+    optimized.output_nets = output_nets
+    optimized.tied_high = tied - {compiled.vcc_net}
+    optimized._slices = {}
+    report.gates_after = len(optimized.network.gates)
+    return optimized, report
@@ -0,0 +1,115 @@
+# redraw.py
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pygame
+
+from geometry import PointSet
+from netlist import GATE_PIN_NAMES
+from snap import SNAP_RING_RADIUS
+
+# Dirty-rectangle bookkeeping for the main loop: edits mark the screen
+# areas they affect, a frame is composed only when something is marked,
+# and only the marked areas are pushed to the display.
+
+COMPONENT_MARGIN = 30  # Room around a component's points for its body, labels and pin rings
+POINT_RADIUS = 14      # Covers a hole or output circle with its conflict ring
+SWITCH_HALF_SIZE = (50, 40)  # Switch circle plus its label above it
+MAX_DIRTY_RECTS = 32   # Past this many rects one bounding rect is cheaper to push
+
+Point = Tuple[int, int]
+
+
+class DirtyRegions:
+    """Screen areas that changed since the last frame was pushed"""
+
+    def __init__(self, size: Tuple[int, int]):
+        self.screen = pygame.Rect((0, 0), size)
+        self.rects: List[pygame.Rect] = []
+        self.full = True  # The first frame is always drawn whole
+
+    def __bool__(self) -> bool:
+        return self.full or bool(self.rects)
+
+    def mark(self, rect):
+        rect = pygame.Rect(rect).clip(self.screen)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def mark_all(self):
+        self.full = True
+
+    def mark_point(self, pos: Point, radius: int = POINT_RADIUS):
+        self.mark((pos[0] - radius, pos[1] - radius, 2 * radius, 2 * radius))
+
+    def mark_points(self, points: Iterable[Optional[Point]], margin: int):
+        points = [point for point in points if point is not None]
+        if points:
+            xs = [point[0] for point in points]
+            ys = [point[1] for point in points]
+            self.mark((min(xs) - margin, min(ys) - margin,
+                       max(xs) - min(xs) + 2 * margin, max(ys) - min(ys) + 2 * margin))
+
+    def mark_line(self, start: Point, end: Point, width: int = 4):
+        self.mark_points((start, end), width)
+
+    def mark_component(self, component):
+        """A gate or LED, with its pins and the legs to the holes they snapped to"""
+        self.mark_points(component_points(component), COMPONENT_MARGIN)
+
+    def mark_snap_preview(self, snapped: Dict[str, Point]):
+        """The rings around the holes a dragged component would snap to.
+
+        A pin clamped to the board edge can snap to a hole well outside the
+        component's own rect, so each ring is marked on its own.
+        """
+        for hole in snapped.values():
+            self.mark_point(hole, SNAP_RING_RADIUS + 1)  # The ring's outer pixels sit on the radius
+
+    def mark_switch(self, switch):
+        half_width, half_height = SWITCH_HALF_SIZE
+        self.mark((switch.x - half_width, switch.y - half_height, 2 * half_width, 2 * half_height))
+        self.mark_point(switch.output_pos, switch.connection_radius + 2)
+
+    def flush(self):
+        """Push the marked areas (or the whole window) to the display"""
+        if self.full or len(self.rects) > MAX_DIRTY_RECTS:
+            if self.full:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self.rects[0].unionall(self.rects[1:]))
+        elif self.rects:
+            pygame.display.update(self.rects)
+        self.rects = []
+        self.full = False
+
+
+def component_points(component) -> List[Point]:
+    """Body center, pin positions and pin connections of a gate or LED"""
+    points = [(component.x, component.y)]
+    for name in GATE_PIN_NAMES + ['anode', 'cathode']:
+        points.append(getattr(component, f"{name}_pos", None))
+        points.append(getattr(component, f"{name}_connection", None))
+    return [point for point in points if point is not None]
+
+
+class PowerWatcher:
+    """Finds the points whose simulated state changed since the last check"""
+
+    def __init__(self, point_sets: Sequence[PointSet]):
+        self.point_sets = point_sets
+        self.flags = [b''] * len(point_sets)
+
+    def changed_points(self) -> List[Point]:
+        changed = set()
+        for i, point_set in enumerate(self.point_sets):
+            flags = bytes(point_set.flags)
+            old = self.flags[i]
+            if flags != old:
+                size = max(len(flags), len(old))
+                old, new = old.ljust(size, b'\0'), flags.ljust(size, b'\0')
+                changed.update(point_id for point_id in range(size) if old[point_id] != new[point_id])
+                self.flags[i] = flags
+        if not changed:
+            return []
+        points = self.point_sets[0].index.points
+        return [points[point_id] for point_id in changed]
@@ -0,0 +1,212 @@
+# resultcache.py
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from simulator import Circuit, CompiledCircuit
+from sweep import sweep_stimulus, sweep_truth_table
+from truthtable import TruthTable
+
+# Results keyed by circuit structure. structural_hash() gives the same digest
+# for circuits that differ only in gate names, gate order outside feedback
+# loops, wire order or board position, so a reloaded or re-generated design
+# finds the truth table and sweep results computed for it before in ResultCache.
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', '2d-circuit-gen')
+DEFAULT_MAX_ENTRIES = 256
+EVICTION_POLICIES = ('lru', 'fifo')  # Evict least recently used, or oldest written
+
+
+def _digest(value) -> str:
+    return hashlib.sha1(repr(value).encode()).hexdigest()
+
+
+def structural_hash(circuit: Union[Circuit, CompiledCircuit]) -> str:
+    """Canonical hash of the gate network, independent of naming and ordering.
+
+    Nets and gates are labelled by colour refinement: a net starts from the
+    inputs, outputs and supplies attached to it, a gate from its kind and
+    power, and both are relabelled from their neighbours until the labels
+    stop splitting. Only the input and output names and their order anchor
+    the result, since they decide the layout of a truth table. The one order
+    that does count is within a feedback loop: its gates settle in turn, and
+    which one settles first can decide what the loop latches.
+    """
+    compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile()
+    network = compiled.network
+    gates = network.gates
+    # Settling position of each gate in a feedback loop, -1 outside loops
+    positions = [-1] * len(gates)
+    for component in network.schedule:
+        if network.is_cyclic(component):
+            for position, gate_index in enumerate(component):
+                positions[gate_index] = position
+
+    roles: Dict[int, List[tuple]] = {}
+    for name, net in compiled.input_nets.items():
+        roles.setdefault(net, []).append(('in', name))
+    for name, net in compiled.output_nets.items():
+        roles.setdefault(net, []).append(('out', name))
+    supplies = set(compiled.tied_high)
+    if compiled.vcc_net is not None:
+        supplies.add(compiled.vcc_net)
+    for net in supplies:
+        roles.setdefault(net, []).append(('vcc',))
+    nets = set(roles)
+    for gate in gates:
+        nets.update(gate.inputs)
+        nets.add(gate.output)
+        nets.add(gate.power)
+    nets.discard(None)
+    net_labels = _ranks({net: tuple(sorted(roles.get(net, ()))) for net in nets})
+    net_labels[None] = -1
+
+    classes = 0
+    while True:
+        # Every two-input gate is symmetric, so its inputs are a multiset
+        gate_signatures = [(gate.kind, gate.grounded, tuple(sorted(net_labels[net] for net in gate.inputs)),
+                            net_labels[gate.output], net_labels[gate.power], position)
+                           for gate, position in zip(gates, positions)]
+        gate_labels = _ranks(dict(enumerate(gate_signatures)))
+        attached: Dict[int, List[tuple]] = {net: [] for net in nets}
+        for gate_index, gate in enumerate(gates):
+            label = gate_labels[gate_index]
+            attached[gate.output].append((0, label))
+            for net in gate.inputs:
+                attached[net].append((1, label))
+            if gate.power is not None:
+                attached[gate.power].append((2, label))
+        refined = _ranks({net: (net_labels[net], tuple(sorted(attached[net]))) for net in nets})
+        refined[None] = -1
+        count = len(set(refined.values())) + len(set(gate_labels.values()))
+        if count <= classes:
+            break
+        classes = count
+        net_labels = refined
+
+    return _digest((list(compiled.input_nets), list(compiled.output_nets), sorted(gate_signatures),
+                    [net_labels[net] for net in compiled.output_nets.values()]))
+
+
+def _ranks(signatures: Dict) -> Dict:
+    """Replace each signature by its rank among the distinct signatures.
+
+    Ranks depend only on the signatures themselves, not on the order of the
+    keys, which keeps the labels canonical from one round to the next.
+    """
+    order = {signature: rank for rank, signature in enumerate(sorted(set(signatures.values())))}
+    return {key: order[signature] for key, signature in signatures.items()}
+
+
+class ResultCache:
+    """Bounded on-disk cache of JSON results, one file per entry.
+
+    policy 'lru' refreshes an entry's timestamp on every hit, 'fifo' keeps
+    the write time; either way the oldest entries go first once more than
+    max_entries (or max_bytes, if set) are stored.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: Optional[int] = None, policy: str = 'lru'):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}', expected one of {EVICTION_POLICIES}")
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    def get(self, key: str):
+        path = self._file(key)
+        try:
+            with open(path, 'r') as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            print(f"Warning: dropping unreadable cache entry {path} ({e})")
+            self._remove(path)
+            self.misses += 1
+            return None
+        if self.policy == 'lru':
+            os.utime(path)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value):
+        path = self._file(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, 'w') as f:
+                json.dump(value, f)
+            os.replace(temporary, path)
+        except Exception as e:
+            print(f"Warning: could not write cache entry {path} ({e})")
+            self._remove(temporary)
+            return
+        self.evict()
+
+    def evict(self):
+        """Drop the oldest entries until the cache is within its bounds"""
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith('.json'):
+                try:
+                    stat = os.stat(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries
+                           or (self.max_bytes is not None and total > self.max_bytes)):
+            _, size, name = entries.pop(0)
+            self._remove(os.path.join(self.path, name))
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.path):
+            if name.endswith('.json'):
+                self._remove(os.path.join(self.path, name))
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def cached_truth_table(circuit: Union[Circuit, CompiledCircuit], cache: ResultCache,
+                       workers: Optional[int] = None) -> TruthTable:
+    """sweep_truth_table, answered from the cache for a structurally identical circuit"""
+    compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile()
+    key = _digest(('truth_table', structural_hash(compiled)))
+    entry = cache.get(key)
+    if entry is None:
+        table = sweep_truth_table(compiled, workers)
+        cache.put(key, {'inputs': table.input_names, 'outputs': table.output_names,
+                        'columns': {name: format(word, 'x') for name, word in table.columns.items()}})
+        return table
+    return TruthTable(entry['inputs'], entry['outputs'],
+                      {name: int(word, 16) for name, word in entry['columns'].items()})
+
+
+def cached_sweep_stimulus(circuit: Union[Circuit, CompiledCircuit], rows: Sequence[Sequence[int]],
+                          cache: ResultCache, workers: Optional[int] = None) -> List[Tuple[int, ...]]:
+    """sweep_stimulus, answered from the cache for the same circuit structure and rows"""
+    compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile()
+    rows = [tuple(int(value) for value in row) for row in rows]
+    key = _digest(('stimulus', structural_hash(compiled), _digest(rows)))
+    entry = cache.get(key)
+    if entry is None:
+        results = sweep_stimulus(compiled, rows, workers)
+        cache.put(key, [list(outputs) for outputs in results])
+        return results
+    return [tuple(outputs) for outputs in entry]
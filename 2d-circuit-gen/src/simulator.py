@@ -0,0 +1,254 @@
+# simulator.py
+import copy
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+from geometry import STRIP_HOLES, PointIndex
+from netlist import (GATE_PIN_NAMES, LOGIC_Z, Conflict, GateNetwork, Netlist, compile_gates,
+                     compile_nets, is_conflict, level_name)
+
+# Headless simulation core: no pygame, no module-level state. A Circuit is
+# a plain description (gates, wires, named inputs and outputs); a Simulator
+# compiles it once and evaluates it for any input assignment.
+
+Point = Hashable
+
+
+class GateSpec:
+    """Headless stand-in for a placed gate: a kind and one point per pin.
+
+    Pins are symbolic points such as ('AND1', 'input1'), so circuits that were
+    never laid out on the breadboard can still be wired and simulated.
+    """
+
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+        for pin_name in GATE_PIN_NAMES:
+            if pin_name == 'input2' and kind == 'NOT':
+                continue
+            setattr(self, f"{pin_name}_pos", (name, pin_name))
+
+    def __repr__(self) -> str:
+        return f"GateSpec({self.kind!r}, {self.name!r})"
+
+
+class Circuit:
+    """Gates, wires and named inputs/outputs of one circuit.
+
+    Gates are any objects with a kind attribute and <pin>_pos points (the
+    pygame gate classes or GateSpec). With ideal_power the gates' VCC and
+    GND pins are ignored and every gate is treated as powered, which is what
+    circuits loaded from a JSON description expect.
+    """
+
+    def __init__(self, vcc_pos: Optional[Point] = None, gnd_pos: Optional[Point] = None,
+                 breadboard: bool = True, ideal_power: bool = False):
+        self.vcc_pos = vcc_pos
+        self.gnd_pos = gnd_pos
+        self.breadboard = breadboard
+        self.ideal_power = ideal_power
+        self.gates: List = []
+        self.wires: List[Tuple[Point, Point]] = []
+        self.inputs: Dict[str, Point] = {}
+        self.outputs: Dict[str, Point] = {}
+
+    def add_gate(self, gate):
+        self.gates.append(gate)
+        return gate
+
+    def add_wire(self, start: Point, end: Point):
+        self.wires.append((start, end))
+
+    def add_input(self, name: str, point: Point):
+        self.inputs[name] = point
+
+    def add_output(self, name: str, point: Point):
+        self.outputs[name] = point
+
+    @classmethod
+    def from_board(cls, gates, wires, input_points: Sequence[Point] = (),
+                   output_points: Sequence[Point] = (), vcc_pos: Optional[Point] = None,
+                   gnd_pos: Optional[Point] = None, ideal_power: bool = False) -> 'Circuit':
+        """Build a circuit from placed gates and wires, e.g. CircuitConverter.setup_circuit output.
+
+        Inputs are named IN1, IN2, ... and outputs OUT1, OUT2, ... in the order given.
+        """
+        circuit = cls(vcc_pos, gnd_pos, ideal_power=ideal_power)
+        for gate in (gates.values() if isinstance(gates, Mapping) else gates):
+            circuit.add_gate(gate)
+        for start, end in wires:
+            circuit.add_wire(start, end)
+        for i, point in enumerate(input_points):
+            circuit.add_input(f"IN{i+1}", point)
+        for i, point in enumerate(output_points):
+            circuit.add_output(f"OUT{i+1}", point)
+        return circuit
+
+    def compile(self, index: Optional[PointIndex] = None) -> 'CompiledCircuit':
+        return CompiledCircuit(self, index if index is not None else PointIndex())
+
+
+class CompiledCircuit:
+    """A Circuit resolved to nets and a levelized gate network"""
+
+    def __init__(self, circuit: Circuit, index: PointIndex):
+        self.circuit = circuit
+        terminals = [circuit.vcc_pos, circuit.gnd_pos]
+        terminals += list(circuit.inputs.values()) + list(circuit.outputs.values())
+        self.netlist: Netlist = compile_nets(circuit.wires, circuit.gates, index, terminals,
+                                             STRIP_HOLES if circuit.breadboard else ())
+        self.vcc_net = self.netlist.net_of(circuit.vcc_pos)
+        self.ground_net = self.netlist.net_of(circuit.gnd_pos)
+        self.network: GateNetwork = compile_gates(self.netlist, circuit.gates, self.ground_net,
+                                                  circuit.ideal_power)
+        self.input_nets: Dict[str, int] = {name: self.netlist.net_of(point)
+                                           for name, point in circuit.inputs.items()}
+        self.output_nets: Dict[str, int] = {name: self.netlist.net_of(point)
+                                            for name, point in circuit.outputs.items()}
+        self.gate_indices: List[int] = list(range(len(self.network.gates)))  # Into circuit.gates
+        self.tied_high: Set[int] = set()  # Nets held at 1 by constant folding, like VCC
+        self._slices: Dict[frozenset, 'CompiledCircuit'] = {}
+
+    def slice(self, observed: Iterable[str]) -> 'CompiledCircuit':
+        """The cone of influence of the observed outputs, as a smaller compiled circuit.
+
+        Only the gates in the transitive fan-in of those outputs are kept, and
+        only the inputs that reach them. Slices are computed once per output
+        set and cached, so repeated queries, truth tables and batch runs pay
+        for the cone alone.
+        """
+        key = frozenset(observed)
+        sliced = self._slices.get(key)
+        if sliced is None:
+            unknown = key - self.output_nets.keys()
+            if unknown:
+                raise KeyError(f"Unknown outputs {sorted(unknown)}")
+            output_nets = {name: net for name, net in self.output_nets.items() if name in key}
+            cone = self.network.cone(net for net in output_nets.values() if net is not None)
+            sliced = copy.copy(self)
+            sliced.network = self.network.subnetwork(cone)
+            sliced.gate_indices = [self.gate_indices[i] for i in cone]
+            read = set(output_nets.values())
+            for gate in sliced.network.gates:
+                read.update(gate.inputs)
+                read.add(gate.power)
+            sliced.input_nets = {name: net for name, net in self.input_nets.items() if net in read}
+            sliced.output_nets = output_nets
+            sliced._slices = {}
+            self._slices[key] = sliced
+        return sliced
+
+    def sources(self, inputs: Mapping[str, int], ones: int = 1) -> Dict[int, int]:
+        """Net drive values for VCC plus the given input assignment"""
+        sources: Dict[int, int] = {}
+        if self.vcc_net is not None:
+            sources[self.vcc_net] = ones
+        for net in self.tied_high:
+            sources[net] = ones
+        for name, value in inputs.items():
+            net = self.input_nets[name]
+            sources[net] = sources.get(net, 0) | value
+        return sources
+
+    def sources4(self, inputs: Mapping[str, int], ones: int = 1) -> Dict[int, Tuple[int, int]]:
+        """Four-valued drive: VCC high, GND low, each input high or low by its value"""
+        drives = [(self.vcc_net, (ones, 0)), (self.ground_net, (0, ones))]
+        drives += [(net, (ones, 0)) for net in self.tied_high]
+        for name, value in inputs.items():
+            drives.append((self.input_nets[name], (value & ones, ~value & ones)))
+        sources: Dict[int, Tuple[int, int]] = {}
+        for net, (high, low) in drives:
+            if net is None:
+                continue
+            old_high, old_low = sources.get(net, LOGIC_Z)
+            sources[net] = (old_high | high, old_low | low)
+        return sources
+
+    def evaluate4(self, inputs: Mapping[str, int], ones: int = 1,
+                  state: Optional[List[Tuple[int, int]]] = None) -> Dict[int, Tuple[int, int]]:
+        """Net (high, low) planes for one input assignment, see GateNetwork.evaluate4"""
+        return self.network.evaluate4(self.sources4(inputs, ones), ones, state)
+
+    def conflicts(self, inputs: Mapping[str, int], gate_outputs: Sequence[Tuple[int, int]]) -> List[Conflict]:
+        """Shorts and contention, from the drivers of a single-bit evaluate4"""
+        counts: Dict[int, List[int]] = {}
+
+        def count(net, high, low, is_gate):
+            if net is not None:
+                totals = counts.setdefault(net, [0, 0, 0, 0])
+                totals[0] += high
+                totals[1] += low
+                totals[2] += 1
+                totals[3] += is_gate
+
+        count(self.vcc_net, 1, 0, 0)
+        count(self.ground_net, 0, 1, 0)
+        for name, value in inputs.items():
+            count(self.input_nets[name], value & 1, ~value & 1, 0)
+        for gate, output in zip(self.network.gates, gate_outputs):
+            if output != LOGIC_Z:
+                count(gate.output, output[0] & 1, output[1] & 1, 1)
+
+        found = {net: Conflict('short' if net == self.vcc_net == self.ground_net else 'contention', net, [], [])
+                 for net, totals in counts.items() if is_conflict(*totals)}
+        if found:
+            for i, (start, _) in enumerate(self.circuit.wires):
+                conflict = found.get(self.netlist.net_of(start))
+                if conflict:
+                    conflict.wires.append(i)
+            for i, gate in zip(self.gate_indices, self.network.gates):
+                if gate.output in found:
+                    found[gate.output].gates.append(i)
+        return list(found.values())
+
+    def evaluate(self, inputs: Mapping[str, int], ones: int = 1,
+                 state: Optional[List[int]] = None) -> Dict[int, int]:
+        """Net values for one input assignment (or one packed word per input)"""
+        return self.network.evaluate(self.sources(inputs, ones), ones, state)
+
+
+class Simulator:
+    """Evaluates a compiled circuit; holds only the current input assignment"""
+
+    def __init__(self, circuit: Union[Circuit, CompiledCircuit], index: Optional[PointIndex] = None,
+                 observe: Optional[Iterable[str]] = None):
+        self.compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile(index)
+        if observe is not None:
+            self.compiled = self.compiled.slice(observe)
+        self.inputs: Dict[str, int] = {name: 0 for name in self.compiled.input_nets}
+        self.net_values: Dict[int, int] = {}
+        self.net_levels: Dict[int, Tuple[int, int]] = {}
+        self.gate_levels: List[Tuple[int, int]] = []
+
+    def set_input(self, name: str, value: int):
+        if name not in self.inputs:
+            raise KeyError(f"Unknown input '{name}'")
+        self.inputs[name] = 1 if value else 0
+
+    def run(self, inputs: Optional[Mapping[str, int]] = None) -> Dict[str, int]:
+        """Settle the circuit and return the value of every output"""
+        if inputs:
+            for name, value in inputs.items():
+                self.set_input(name, value)
+        self.net_values = self.compiled.evaluate(self.inputs)
+        return self.outputs()
+
+    def outputs(self) -> Dict[str, int]:
+        return {name: self.net_values.get(net, 0) for name, net in self.compiled.output_nets.items()}
+
+    def powered_nets(self) -> List[int]:
+        return [net for net, value in self.net_values.items() if value]
+
+    def run_levels(self, inputs: Optional[Mapping[str, int]] = None) -> Dict[str, str]:
+        """Like run() in four-valued logic: every output as '0', '1', 'X' or 'Z'"""
+        if inputs:
+            for name, value in inputs.items():
+                self.set_input(name, value)
+        self.gate_levels = [LOGIC_Z] * len(self.compiled.network.gates)
+        self.net_levels = self.compiled.evaluate4(self.inputs, 1, self.gate_levels)
+        return {name: level_name(self.net_levels.get(net, LOGIC_Z))
+                for name, net in self.compiled.output_nets.items()}
+
+    def conflicts(self) -> List[Conflict]:
+        """Shorts and contention found by the last run_levels()"""
+        return self.compiled.conflicts(self.inputs, self.gate_levels)
@@ -0,0 +1,98 @@
+# snap.py
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pygame
+
+from geometry import BLOCK_BASE, BLOCKS, CELL_PITCH, HOLE_POS
+from netlist import GATE_PIN_NAMES
+
+# Snap-to-grid for dropped components. The four terminal-strip sections are
+# regular lattices, so their nearest hole comes from rounding and clamping
+# the pin position; the short rail segments are kept in a small KD-tree.
+# Ties go to the lower hole ID, the order the board's hole list is in.
+
+SNAP_PREVIEW_COLOR = (0, 0, 255)  # Ring around the hole a pin would snap to
+SNAP_RING_RADIUS = 8
+SNAP_RING_WIDTH = 2
+
+Point = Tuple[int, int]
+
+
+def _distance(a: Point, b: Point) -> int:
+    dx = a[0] - b[0]
+    dy = a[1] - b[1]
+    return dx * dx + dy * dy
+
+
+def _lattice_candidates(pos: Point, block: int) -> List[int]:
+    """IDs of the holes of one lattice block around pos, clamped to the block"""
+    x0, y0, columns, rows, _ = BLOCKS[block]
+    column = (pos[0] - x0) // CELL_PITCH
+    row = (pos[1] - y0) // CELL_PITCH
+    ids = []
+    for c in {min(max(column, 0), columns - 1), min(max(column + 1, 0), columns - 1)}:
+        for r in {min(max(row, 0), rows - 1), min(max(row + 1, 0), rows - 1)}:
+            ids.append(BLOCK_BASE[block] + c * rows + r)
+    return ids
+
+
+class KDTree:
+    """2-d tree over hole IDs for nearest-hole queries"""
+
+    def __init__(self, hole_ids: Sequence[int]):
+        self.root = self._build(sorted(hole_ids), 0)
+
+    def _build(self, hole_ids: List[int], axis: int):
+        if not hole_ids:
+            return None
+        hole_ids = sorted(hole_ids, key=lambda hole_id: (HOLE_POS[hole_id][axis], hole_id))
+        middle = len(hole_ids) // 2
+        return (hole_ids[middle], axis,
+                self._build(hole_ids[:middle], 1 - axis), self._build(hole_ids[middle + 1:], 1 - axis))
+
+    def nearest(self, pos: Point, best: Tuple[float, int] = (float('inf'), -1)) -> Tuple[float, int]:
+        """(squared distance, hole ID) of the nearest hole, lowest ID on ties.
+
+        best is a candidate found elsewhere; subtrees that cannot beat it are skipped.
+        """
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            hole_id, axis, low, high = node
+            best = min(best, (_distance(pos, HOLE_POS[hole_id]), hole_id))
+            offset = pos[axis] - HOLE_POS[hole_id][axis]
+            near, far = (low, high) if offset < 0 else (high, low)
+            if offset * offset <= best[0]:
+                stack.append(far)
+            stack.append(near)
+        return best
+
+
+LATTICE_BLOCKS = [block for block, (_, _, _, _, is_rail) in enumerate(BLOCKS) if not is_rail]
+RAIL_TREE = KDTree([BLOCK_BASE[block] + i for block, (_, _, columns, rows, is_rail) in enumerate(BLOCKS)
+                    if is_rail for i in range(columns * rows)])
+
+
+def nearest_hole(pos: Point) -> Point:
+    """Position of the hole nearest to pos"""
+    best = min((_distance(pos, HOLE_POS[hole_id]), hole_id)
+               for block in LATTICE_BLOCKS for hole_id in _lattice_candidates(pos, block))
+    return HOLE_POS[RAIL_TREE.nearest(pos, best)[1]]
+
+
+def snap_pins(component, pin_names: Optional[Sequence[str]] = None) -> Dict[str, Point]:
+    """The hole each pin of a gate would snap to, keyed by pin name"""
+    snapped = {}
+    for pin_name in (pin_names or GATE_PIN_NAMES):
+        pin_pos = getattr(component, f"{pin_name}_pos", None)
+        if pin_pos is not None:
+            snapped[pin_name] = nearest_hole(pin_pos)
+    return snapped
+
+
+def draw_snap_preview(window: pygame.Surface, snapped: Dict[str, Point]):
+    """Rings around the holes a dragged component would snap to"""
+    for hole in snapped.values():
+        pygame.draw.circle(window, SNAP_PREVIEW_COLOR, hole, SNAP_RING_RADIUS, SNAP_RING_WIDTH)
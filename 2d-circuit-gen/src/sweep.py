@@ -0,0 +1,200 @@
+# sweep.py
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from simulator import Circuit, CompiledCircuit
+from truthtable import TruthTable, input_word
+
+# Multi-core sweeps: the input space (or a stimulus list) is cut into chunks
+# that are evaluated bit-parallel in worker processes. Each worker receives
+# the compiled circuit once, through the pool initializer, and chunks only
+# carry their index.
+
+CHUNKS_PER_WORKER = 4  # A few chunks per worker keeps the pool evenly loaded
+
+_worker_circuit: Optional[CompiledCircuit] = None
+
+
+def _init_worker(compiled: CompiledCircuit):
+    global _worker_circuit
+    _worker_circuit = compiled
+
+
+def _table_chunk(shard_bits: int, chunk: int) -> List[int]:
+    """Output words for the rows whose top shard_bits inputs spell chunk"""
+    compiled = _worker_circuit
+    input_names = list(compiled.input_nets)
+    count = len(input_names)
+    rows = 1 << (count - shard_bits)
+    ones = (1 << rows) - 1
+    words = {}
+    for i, name in enumerate(input_names):
+        position = count - 1 - i
+        if i < shard_bits:
+            words[name] = ones if (chunk >> (position - (count - shard_bits))) & 1 else 0
+        else:
+            words[name] = input_word(position, rows)
+    values = compiled.evaluate(words, ones)
+    return [values.get(net, 0) & ones for net in compiled.output_nets.values()]
+
+
+def _stimulus_chunk(rows: Sequence[Sequence[int]]) -> List[Tuple[int, ...]]:
+    """Output tuples for a chunk of input rows, evaluated as packed words"""
+    compiled = _worker_circuit
+    words = {name: 0 for name in compiled.input_nets}
+    names = list(words)
+    for r, row in enumerate(rows):
+        for name, value in zip(names, row):
+            if value:
+                words[name] |= 1 << r
+    ones = (1 << len(rows)) - 1
+    values = compiled.evaluate(words, ones)
+    columns = [values.get(net, 0) for net in compiled.output_nets.values()]
+    return [tuple((column >> r) & 1 for column in columns) for r in range(len(rows))]
+
+
+def _run(compiled: CompiledCircuit, workers: int, func, jobs: List[tuple]) -> list:
+    """Run func over jobs, in a process pool when more than one worker is asked for"""
+    if workers <= 1 or len(jobs) <= 1:
+        _init_worker(compiled)
+        return [func(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(compiled,)) as pool:
+        return list(pool.map(func, *zip(*jobs)))
+
+
+def sweep_truth_table(circuit: Union[Circuit, CompiledCircuit], workers: Optional[int] = None,
+                      observe: Optional[Iterable[str]] = None) -> TruthTable:
+    """Exhaustive truth table computed in parallel chunks of the input space.
+
+    observe restricts it to those outputs and their cone, as in truth_table.
+    """
+    compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile()
+    if observe is not None:
+        compiled = compiled.slice(observe)
+    workers = workers or os.cpu_count() or 1
+    input_names = list(compiled.input_nets)
+    count = len(input_names)
+
+    # Fix the top shard_bits inputs per chunk, sweep the rest bit-parallel
+    shard_bits = 0
+    while shard_bits < count and (1 << shard_bits) < workers * CHUNKS_PER_WORKER:
+        shard_bits += 1
+    if workers <= 1:
+        shard_bits = 0
+    chunks = _run(compiled, workers, _table_chunk, [(shard_bits, c) for c in range(1 << shard_bits)])
+
+    rows = 1 << count
+    width = 1 << (count - shard_bits)
+    columns = {name: input_word(count - 1 - i, rows) for i, name in enumerate(input_names)}
+    for j, name in enumerate(compiled.output_nets):
+        word = 0
+        for chunk, outputs in enumerate(chunks):
+            word |= outputs[j] << (chunk * width)
+        columns[name] = word
+    return TruthTable(input_names, list(compiled.output_nets), columns)
+
+
+def sweep_stimulus(circuit: Union[Circuit, CompiledCircuit], rows: Sequence[Sequence[int]],
+                   workers: Optional[int] = None,
+                   chunk_size: Optional[int] = None) -> List[Tuple[int, ...]]:
+    """Evaluate stimulus rows (one value per input, in input order) across workers.
+
+    Returns one tuple of output values per row, in the order of rows.
+    """
+    compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile()
+    workers = workers or os.cpu_count() or 1
+    rows = rows.tolist() if hasattr(rows, 'tolist') else list(rows)
+    if not rows:
+        return []
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(rows) // (workers * CHUNKS_PER_WORKER)))
+    jobs = [(rows[start:start + chunk_size],) for start in range(0, len(rows), chunk_size)]
+    results = []
+    for outputs in _run(compiled, workers, _stimulus_chunk, jobs):
+        results.extend(outputs)
+    return results
+
+
+def read_stimulus(path: str, input_count: Optional[int] = None) -> List[Tuple[int, ...]]:
+    """Read one input vector per line: 0/1 values, optionally comma or space separated.
+
+    Blank lines and lines starting with '#' are skipped. Raises ValueError, naming
+    the line, for any value other than 0 or 1 and, when input_count is given,
+    for a row with a different number of values.
+    """
+    rows = []
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            tokens = line.replace(',', ' ').split()
+            # A single token is a packed bit string such as 0101
+            values = tokens[0] if len(tokens) == 1 else tokens
+            for value in values:
+                if value not in ('0', '1'):
+                    raise ValueError(f"line {line_number}: expected 0 or 1, got {value!r}")
+            if input_count is not None and len(values) != input_count:
+                raise ValueError(f"line {line_number}: expected {input_count} values, got {len(values)}")
+            rows.append(tuple(int(value) for value in values))
+    return rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Sweep a circuit JSON file across all cores')
+    parser.add_argument('circuit_json', type=str, help='Path to circuit JSON file')
+    parser.add_argument('--stimulus', type=str, help='File of input vectors; exhaustive if omitted')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--vcd', type=str, help='Write the stimulus run as a VCD waveform')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Fold constants and drop dead gates before sweeping')
+    parser.add_argument('--cache', type=str, nargs='?', const='', default=None,
+                        help='Reuse results of structurally identical circuits (optional cache directory)')
+    parser.add_argument('--cache-size', type=int, default=None, help='Cache entries kept before eviction')
+    parser.add_argument('--cache-policy', type=str, default='lru', choices=['lru', 'fifo'],
+                        help='Which cache entries are evicted first')
+    parser.add_argument('--observe', type=str, nargs='+', help='Only these outputs (truth table mode)')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from json_circ import CircuitConverter
+
+    args = parse_args()
+    try:
+        circuit = CircuitConverter().setup_headless(args.circuit_json)
+    except ValueError as e:
+        raise SystemExit(f"Error loading {args.circuit_json}: {e}")
+    compiled = circuit.compile()
+    if args.optimize:
+        from optimize import optimize
+        compiled, report = optimize(compiled)
+        print(report.format())
+    cache = None
+    if args.cache is not None:
+        from resultcache import (DEFAULT_CACHE_DIR, DEFAULT_MAX_ENTRIES, ResultCache,
+                                 cached_sweep_stimulus, cached_truth_table)
+        cache = ResultCache(args.cache or DEFAULT_CACHE_DIR, args.cache_size or DEFAULT_MAX_ENTRIES,
+                            policy=args.cache_policy)
+    if args.stimulus:
+        try:
+            rows = read_stimulus(args.stimulus, len(circuit.inputs))
+        except ValueError as e:
+            raise SystemExit(f"Error reading {args.stimulus}: {e}")
+        if cache is not None:
+            results = cached_sweep_stimulus(compiled, rows, cache, args.workers)
+        else:
+            results = sweep_stimulus(compiled, rows, args.workers)
+        print(" ".join(circuit.outputs))
+        for outputs in results:
+            print(" ".join(str(value).rjust(len(name)) for name, value in zip(circuit.outputs, outputs)))
+        if args.vcd:
+            from vcd import write_vectors
+            write_vectors(args.vcd, list(circuit.inputs), list(circuit.outputs), rows, results)
+    elif cache is not None and args.observe is None:
+        print(cached_truth_table(compiled, cache, args.workers).format())
+    else:
+        print(sweep_truth_table(compiled, args.workers, args.observe).format())
@@ -0,0 +1,27 @@
+# test_batch.py
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from batch import simulate_batch
+
+
+def test_batch_matches_reference(random_circuit):
+    rows = list(random_circuit.rows())
+    stimulus = np.array([list(inputs.values()) for inputs in rows])
+    result = simulate_batch(random_circuit.circuit, stimulus)
+    assert result.shape == (len(rows), len(random_circuit.output_names))
+    for inputs, outputs in zip(rows, result.tolist()):
+        assert outputs == [bool(value) for value in random_circuit.reference(inputs).values()]
+
+
+def test_observed_batch_matches_full(random_circuit):
+    stimulus = np.array([list(inputs.values()) for inputs in random_circuit.rows()])
+    full = simulate_batch(random_circuit.circuit, stimulus)
+    observed = simulate_batch(random_circuit.circuit, stimulus, observe=random_circuit.output_names[-1:])
+    assert (observed[:, 0] == full[:, -1]).all()
+
+
+def test_batch_rejects_wrong_shape(random_circuit):
+    with pytest.raises(ValueError):
+        simulate_batch(random_circuit.circuit, np.zeros((4, 1)))
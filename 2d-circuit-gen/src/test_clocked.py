@@ -0,0 +1,71 @@
+# test_clocked.py
+import random
+
+import pytest
+
+from clocked import ClockedSimulator
+from netlist import GATE_LOGIC
+from simulator import Circuit, GateSpec
+
+pytestmark = pytest.mark.filterwarnings('ignore::netlist.UnsettledWarning')
+
+
+def sequential_circuit(seed: int, gates: int = 8) -> Circuit:
+    """Random gates reading CLK, D or any gate output, so feedback loops hold state"""
+    rng = random.Random(seed)
+    circuit = Circuit(breadboard=False, ideal_power=True)
+    circuit.add_input('CLK', ('switch', 'CLK'))
+    circuit.add_input('D', ('switch', 'D'))
+    placed = [circuit.add_gate(GateSpec(rng.choice(sorted(GATE_LOGIC)), f"G{g+1}")) for g in range(gates)]
+    signals = [('switch', 'CLK'), ('switch', 'D')] + [gate.output_pos for gate in placed]
+    for gate in placed:
+        for pin_name in ('input1', 'input2'):
+            pin_pos = getattr(gate, f"{pin_name}_pos", None)
+            if pin_pos is not None:
+                circuit.add_wire(rng.choice(signals), pin_pos)
+    for i, gate in enumerate(rng.sample(placed, 2)):
+        circuit.add_output(f"OUT{i+1}", gate.output_pos)
+    return circuit
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_fast_forward_matches_stepping(seed):
+    circuit = sequential_circuit(seed)
+    fast = ClockedSimulator(circuit)
+    slow = ClockedSimulator(circuit)
+    for simulator in (fast, slow):
+        simulator.set_input('D', seed & 1)
+    cycles = 300 + seed
+    report = fast.run(cycles)
+    for _ in range(cycles):
+        slow.step()
+    assert fast.cycle == slow.cycle == cycles
+    assert fast.state == slow.state
+    assert fast.outputs() == slow.outputs()
+    assert report['simulated'] + report['skipped'] == cycles
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_stimulus_disables_fast_forward(seed):
+    circuit = sequential_circuit(seed)
+    driven = ClockedSimulator(circuit)
+    stepped = ClockedSimulator(circuit)
+    report = driven.run(200, lambda cycle: {'D': (cycle // 3) & 1})
+    for cycle in range(200):
+        stepped.set_input('D', (cycle // 3) & 1)
+        stepped.step()
+    assert report['skipped'] == 0
+    assert driven.state == stepped.state
+
+
+def test_rates_separate_simulated_and_skipped_cycles():
+    simulator = ClockedSimulator(sequential_circuit(0))
+    report = simulator.run(1_000_000)
+    assert report['simulated'] < 1000
+    assert report['steps_per_second'] == pytest.approx(report['simulated'] / report['seconds'])
+    assert report['effective_cycles_per_second'] == pytest.approx(report['cycles'] / report['seconds'])
+
+
+def test_unknown_clock():
+    with pytest.raises(KeyError):
+        ClockedSimulator(sequential_circuit(0), clock='CLOCK')
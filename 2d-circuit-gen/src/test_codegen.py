@@ -0,0 +1,39 @@
+# test_codegen.py
+import warnings
+
+from codegen import CodegenEvaluator, generate_source
+from netlist import UnsettledWarning
+from simulator import Circuit, GateSpec, Simulator
+from truthtable import truth_table
+
+
+def test_codegen_matches_simulator(random_circuit):
+    evaluator = CodegenEvaluator(random_circuit.circuit)
+    simulator = Simulator(random_circuit.circuit)
+    for inputs in random_circuit.rows():
+        assert evaluator.run(inputs) == simulator.run(inputs)
+
+
+def test_codegen_packed_matches_truth_table(random_circuit):
+    table = truth_table(random_circuit.circuit)
+    evaluator = CodegenEvaluator(random_circuit.circuit)
+    ones = (1 << table.rows) - 1
+    columns = evaluator.run({name: table.column(name) for name in table.input_names}, ones)
+    for name in table.output_names:
+        assert columns[name] & ones == table.column(name)
+
+
+def test_unsettled_loop_warns_once():
+    circuit = Circuit(breadboard=False, ideal_power=True)
+    ring = circuit.add_gate(GateSpec('NOT', 'NOT1'))
+    circuit.add_wire(ring.output_pos, ring.input1_pos)
+    circuit.add_output('OUT1', ring.output_pos)
+    compiled = circuit.compile()
+    assert 'warn_unsettled()' in generate_source(compiled)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('default')
+        evaluator = CodegenEvaluator(compiled)
+        for _ in range(20):
+            evaluator.run({})
+            compiled.evaluate({})
+    assert [warning.category for warning in caught] == [UnsettledWarning]
@@ -0,0 +1,50 @@
+# test_faults.py
+import pytest
+
+import faults
+from faults import exhaustive_vectors, fault_list, simulate_faults
+from simulator import Circuit, GateSpec
+
+
+def first_detecting_vector(random_circuit, fault, vectors):
+    for v, vector in enumerate(vectors):
+        inputs = dict(zip(random_circuit.input_names, vector))
+        if random_circuit.reference(inputs, fault) != random_circuit.reference(inputs):
+            return v
+    return None
+
+
+def test_detection_matches_reference(random_circuit):
+    vectors = exhaustive_vectors(len(random_circuit.input_names))
+    report = simulate_faults(random_circuit.circuit, vectors)
+    assert len(report.faults) == sum(2 * (len(picks) + 1) for _, picks in random_circuit.gates)
+    for i, fault in enumerate(report.faults):
+        expected = first_detecting_vector(random_circuit, (fault.gate, fault.pin, fault.value), vectors)
+        assert report.detected_by.get(i) == expected, str(fault)
+
+
+def test_fault_groups_give_the_same_report(random_circuit, monkeypatch):
+    vectors = exhaustive_vectors(len(random_circuit.input_names))
+    grouped = simulate_faults(random_circuit.circuit, vectors)
+    monkeypatch.setattr(faults, 'FAULT_LANES', 3)
+    assert simulate_faults(random_circuit.circuit, vectors).detected_by == grouped.detected_by
+
+
+def test_redundant_gate_faults_go_undetected():
+    # OUT1 = IN1 OR (IN1 AND IN2): the AND gate's faults never show for stuck-at-0
+    circuit = Circuit(breadboard=False, ideal_power=True)
+    circuit.add_input('IN1', ('switch', 'IN1'))
+    circuit.add_input('IN2', ('switch', 'IN2'))
+    both = circuit.add_gate(GateSpec('AND', 'AND1'))
+    either = circuit.add_gate(GateSpec('OR', 'OR1'))
+    circuit.add_wire(('switch', 'IN1'), both.input1_pos)
+    circuit.add_wire(('switch', 'IN2'), both.input2_pos)
+    circuit.add_wire(('switch', 'IN1'), either.input1_pos)
+    circuit.add_wire(both.output_pos, either.input2_pos)
+    circuit.add_output('OUT1', either.output_pos)
+    compiled = circuit.compile()
+    report = simulate_faults(compiled, exhaustive_vectors(2))
+    undetected = {str(fault) for fault in report.undetected}
+    assert 'AND1.output stuck-at-0' in undetected
+    assert 'OR1.output stuck-at-0' not in undetected
+    assert report.coverage == pytest.approx(len(report.detected) / len(fault_list(compiled)))
@@ -0,0 +1,105 @@
+# test_hittest.py
+import random
+
+import pytest
+
+from hittest import CELL_SIZE, CLICK_RADIUS, HOLE, PIN, SUPPLY, SpatialHash
+
+KINDS = range(HOLE + 1)
+
+
+class Pins:
+    """A stand-in component with two pins"""
+
+    def __init__(self, x: int, y: int):
+        self.move(x, y)
+
+    def move(self, x: int, y: int):
+        self.input1_pos = (x, y)
+        self.output_pos = (x + 20, y)
+
+
+def brute_force(anchors, pos, radius=CLICK_RADIUS):
+    """The anchor query() should return, from a scan of every anchor"""
+    hits = []
+    for anchor in anchors:
+        distance = (anchor.point[0] - pos[0]) ** 2 + (anchor.point[1] - pos[1]) ** 2
+        if distance <= radius * radius:
+            hits.append(((anchor.kind, distance, anchor.order), anchor))
+    return min(hits, key=lambda hit: hit[0])[1] if hits else None
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_query_matches_brute_force(seed):
+    rng = random.Random(seed)
+    grid = SpatialHash()
+    # Crowd a small area, with many anchors on cell boundaries, so clicks often hit several
+    anchors = []
+    for _ in range(300):
+        if rng.random() < 0.5:
+            point = (rng.randrange(0, 8) * CELL_SIZE + rng.choice([-1, 0, 1]),
+                     rng.randrange(0, 8) * CELL_SIZE + rng.choice([-1, 0, 1]))
+        else:
+            point = (rng.randrange(-10, 140), rng.randrange(-10, 140))
+        anchors.append(grid.add(point, rng.choice(KINDS)))
+    for _ in range(1000):
+        pos = (rng.randrange(-20, 150), rng.randrange(-20, 150))
+        assert grid.query(pos) is brute_force(anchors, pos)
+
+
+def test_click_radius_is_inclusive():
+    grid = SpatialHash()
+    anchor = grid.add((2 * CELL_SIZE, 2 * CELL_SIZE), HOLE)
+    x, y = anchor.point
+    for dx, dy in [(CLICK_RADIUS, 0), (-CLICK_RADIUS, 0), (0, CLICK_RADIUS), (0, -CLICK_RADIUS)]:
+        assert grid.query((x + dx, y + dy)) is anchor
+    assert grid.query((x + CLICK_RADIUS + 1, y)) is None
+    assert grid.query((x, y - CLICK_RADIUS - 1)) is None
+    # Inside the square of the reach but outside the circle
+    assert grid.query((x + CLICK_RADIUS - 2, y + CLICK_RADIUS - 2)) is None
+
+
+def test_reach_crosses_cell_boundaries():
+    grid = SpatialHash()
+    below = grid.add((CELL_SIZE - 1, CELL_SIZE - 1), HOLE)
+    above = grid.add((CELL_SIZE + 2, CELL_SIZE + 2), HOLE)
+    assert grid.query((CELL_SIZE, CELL_SIZE)) is below
+    assert grid.query((CELL_SIZE + 1, CELL_SIZE + 1)) is above
+    assert grid.query((CELL_SIZE - 1 - CLICK_RADIUS, CELL_SIZE - 1)) is below
+    assert grid.query((CELL_SIZE + 2, CELL_SIZE + 2 + CLICK_RADIUS)) is above
+
+
+def test_kind_then_distance_then_order():
+    grid = SpatialHash()
+    hole = grid.add((100, 100), HOLE)
+    supply = grid.add((106, 100), SUPPLY)
+    # A farther anchor of a preferred kind wins over a nearer hole
+    assert grid.query((100, 100)) is supply
+    right_pin = grid.add((104, 100), PIN)
+    left_pin = grid.add((96, 100), PIN)
+    # Same kind: the nearer one
+    assert grid.query((101, 100)) is right_pin
+    assert grid.query((99, 100)) is left_pin
+    # Same kind and distance: the one added first
+    assert grid.query((100, 100)) is right_pin
+    # Out of reach of both pins and the supply, the hole is hit again
+    assert grid.query((100, 108)) is hole
+
+
+def test_moved_components_match_brute_force():
+    rng = random.Random(0)
+    grid = SpatialHash()
+    holes = [grid.add((x, y), HOLE) for x in range(0, 200, 20) for y in range(0, 100, 20)]
+    components = [Pins(rng.randrange(200), rng.randrange(100)) for _ in range(20)]
+    for component in components:
+        grid.add_component(component)
+    for step in range(50):
+        component = rng.choice(components)
+        component.move(rng.randrange(200), rng.randrange(100))
+        grid.move_component(component)
+        if step % 10 == 0:
+            grid.remove_owner(components.pop())
+        anchors = holes + [anchor for component in components for anchor in grid.owned[component]]
+        for _ in range(100):
+            pos = (rng.randrange(-10, 230), rng.randrange(-10, 110))
+            assert grid.query(pos) is brute_force(anchors, pos)
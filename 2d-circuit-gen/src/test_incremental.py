@@ -0,0 +1,162 @@
+# test_incremental.py
+import random
+from typing import Dict, List
+
+import pytest
+
+from geometry import HOLE_IS_RAIL, HOLE_POS, STRIP_HOLES, PointIndex
+from incremental import IncrementalEngine
+from netlist import LOGIC_Z, level_name
+from simulator import Circuit, GateSpec, Simulator
+
+VCC_POS = (800, 50)
+GND_POS = (800, 100)
+
+
+class RandomBoard:
+    """Gates plugged into breadboard strips and wired up without feedback.
+
+    Some gates miss power or ground, some inputs float and some outputs are
+    tied together, so X, Z and contention all show up.
+    """
+
+    def __init__(self, seed: int, switches: int = 3, gates: int = 8):
+        rng = random.Random(seed)
+        self.rng = rng
+        rails = [strip for strip in STRIP_HOLES if HOLE_IS_RAIL[strip[0]]]
+        columns = [strip for strip in STRIP_HOLES if not HOLE_IS_RAIL[strip[0]]]
+        rng.shuffle(columns)
+        vcc_rail, gnd_rail = rails[0], rails[1]
+
+        def hole(strip) -> tuple:
+            return HOLE_POS[rng.choice(strip)]
+
+        self.wires = [(VCC_POS, hole(vcc_rail)), (GND_POS, hole(gnd_rail))]
+        self.switch_points = [('switch', i) for i in range(switches)]
+        self.switch_values = [rng.randint(0, 1) for _ in range(switches)]
+        signals = []    # Strips carrying a value
+        unread = []     # Gate output strips nothing reads yet, safe to tie to another output
+        for point in self.switch_points:
+            strip = columns.pop()
+            self.wires.append((point, hole(strip)))
+            signals.append(strip)
+
+        self.gates = []
+        for g in range(gates):
+            kind = rng.choice(['AND', 'OR', 'NAND', 'NOR', 'NOT'])
+            gate = GateSpec(kind, f"{kind}{g+1}")
+            gate.vcc_connection = hole(vcc_rail) if rng.random() < 0.9 else hole(columns.pop())
+            gate.gnd_connection = hole(gnd_rail) if rng.random() < 0.9 else hole(columns.pop())
+            for pin_name in ('input1', 'input2'):
+                if hasattr(gate, f"{pin_name}_pos"):
+                    strip = columns.pop()
+                    setattr(gate, f"{pin_name}_connection", hole(strip))
+                    if rng.random() < 0.9:
+                        source = rng.choice(signals)
+                        self.wires.append((hole(source), hole(strip)))
+                        if source in unread:
+                            unread.remove(source)
+            output = columns.pop()
+            gate.output_connection = hole(output)
+            if unread and rng.random() < 0.2:
+                self.wires.append((hole(output), hole(rng.choice(unread))))
+            signals.append(output)
+            unread.append(output)
+            self.gates.append(gate)
+
+        self.output_points = [('output', i) for i in range(3)]
+        for point in self.output_points[:2]:
+            self.wires.append((point, hole(rng.choice(signals))))
+        # The last output circle stays unwired and must read Z
+
+
+def engine_levels(engine: IncrementalEngine, points) -> Dict:
+    levels = {}
+    for point in points:
+        if point in engine.unknown_points:
+            levels[point] = 'X'
+        elif point in engine.powered_points:
+            levels[point] = '1'
+        elif point in engine.floating_points:
+            levels[point] = 'Z'
+        else:
+            levels[point] = '0'
+    return levels
+
+
+def rebuild(board: RandomBoard, gates: List, wires: List, points):
+    """Levels and conflicted points from a from-scratch headless simulation"""
+    circuit = Circuit.from_board(gates, wires, board.switch_points, board.output_points, VCC_POS, GND_POS)
+    simulator = Simulator(circuit, PointIndex())
+    simulator.run_levels({f"IN{i+1}": value for i, value in enumerate(board.switch_values)})
+    netlist = simulator.compiled.netlist
+    conflicted = {conflict.net for conflict in simulator.conflicts()}
+    levels = {point: level_name(simulator.net_levels.get(netlist.net_of(point), LOGIC_Z)) for point in points}
+    return levels, {point for point in points if netlist.net_of(point) in conflicted}
+
+
+def board_points(board: RandomBoard) -> List:
+    points = list(HOLE_POS) + board.switch_points + board.output_points + [VCC_POS, GND_POS]
+    for gate in board.gates:
+        points += [getattr(gate, f"{pin_name}_pos") for pin_name in ('input1', 'input2', 'output')
+                   if hasattr(gate, f"{pin_name}_pos")]
+    return points
+
+
+def build_engine(board: RandomBoard):
+    engine = IncrementalEngine(PointIndex(), VCC_POS, GND_POS)
+    engine.add_terminals(board.output_points)
+    gate_ids = [engine.add_gate(gate) for gate in board.gates]
+    wire_ids = [engine.add_wire(start, end) for start, end in board.wires]
+    for point, value in zip(board.switch_points, board.switch_values):
+        engine.set_source(point, value)
+    return engine, gate_ids, wire_ids
+
+
+def assert_same_state(engine, board, gates, wires):
+    points = board_points(board)
+    levels, conflicted = rebuild(board, gates, wires, points)
+    assert engine_levels(engine, points) == levels
+    assert {point for point in points if point in engine.conflict_points} == conflicted
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_incremental_matches_rebuild(seed):
+    board = RandomBoard(seed)
+    engine, _, _ = build_engine(board)
+    assert_same_state(engine, board, board.gates, board.wires)
+    assert engine_levels(engine, board.output_points[2:]) == {board.output_points[2]: 'Z'}
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_removals_match_rebuild(seed):
+    board = RandomBoard(seed)
+    engine, gate_ids, wire_ids = build_engine(board)
+    rng = random.Random(seed)
+    removed_wires = set(rng.sample(range(len(board.wires)), len(board.wires) // 3))
+    removed_gates = set(rng.sample(range(len(board.gates)), 2))
+    for i in removed_wires:
+        engine.remove_wire(wire_ids[i])
+    for i in removed_gates:
+        engine.remove_gate(gate_ids[i])
+    wires = [wire for i, wire in enumerate(board.wires) if i not in removed_wires]
+    gates = [gate for i, gate in enumerate(board.gates) if i not in removed_gates]
+    assert_same_state(engine, board, gates, wires)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_switch_changes_match_rebuild(seed):
+    board = RandomBoard(seed)
+    engine, _, _ = build_engine(board)
+    for i, point in enumerate(board.switch_points):
+        board.switch_values[i] ^= 1
+        engine.set_source(point, board.switch_values[i])
+        assert_same_state(engine, board, board.gates, board.wires)
+
+
+def test_reset_keeps_terminals_floating():
+    board = RandomBoard(0)
+    engine, _, _ = build_engine(board)
+    engine.reset()
+    assert all(point in engine.floating_points for point in board.output_points)
+    assert engine.conflicts() == []
@@ -0,0 +1,51 @@
+# test_json_circ.py
+import json
+import os
+
+import pytest
+
+from json_circ import CircuitConverter
+from truthtable import truth_table
+
+CIRCUIT_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'circuit.json')
+
+
+def write_circuit(tmp_path, boards, connections) -> str:
+    path = tmp_path / 'circuit.json'
+    path.write_text(json.dumps({'IC Boards used': boards, 'Connections': connections}))
+    return str(path)
+
+
+@pytest.mark.parametrize('ic_name, gate_type', [
+    ('AND7408', 'AND'), ('NAND7400', 'NAND'), ('OR7432', 'OR'), ('NOR7402', 'NOR'), ('NOT7404', 'NOT'),
+])
+def test_extract_gate_type(ic_name, gate_type):
+    assert CircuitConverter().extract_gate_type(ic_name) == gate_type
+
+
+def test_nand_nor_design(tmp_path):
+    path = write_circuit(tmp_path, ["NAND7400 - Gates: 1", "NOR7402 - Gates: 1"],
+                         ["IN1 to NAND1IN1", "IN2 to NAND1IN2", "IN1 to NOR1IN1", "IN2 to NOR1IN2",
+                          "NAND1OUT to OUT1", "NOR1OUT to OUT2"])
+    table = truth_table(CircuitConverter().setup_headless(path))
+    assert [outputs for _, outputs in table] == [(1, 1), (1, 0), (1, 0), (0, 0)]
+
+
+def test_bundled_circuit():
+    circuit = CircuitConverter().setup_headless(CIRCUIT_JSON)
+    table = truth_table(circuit)
+    for inputs, outputs in table:
+        in1, in2, in3, in4 = inputs
+        assert outputs == (1 - (in1 & in2), in3 & in4, in1, in1 & in2)
+
+
+@pytest.mark.parametrize('boards, connections', [
+    (["XOR7486 - Gates: 1"], ["IN1 to XOR1IN1"]),
+    (["AND7408 - Gates: 1"], ["IN1 to AND2IN1"]),
+    (["NOT7404 - Gates: 1"], ["IN1 to NOT1IN2"]),
+    (["AND7408 - Gates: 1"], ["AND1IN1 to OUT1"]),
+])
+def test_setup_headless_rejects_unknown_names(tmp_path, boards, connections):
+    path = write_circuit(tmp_path, boards, connections)
+    with pytest.raises(ValueError):
+        CircuitConverter().setup_headless(path)
@@ -0,0 +1,106 @@
+# test_optimize.py
+import random
+import warnings
+
+from codegen import CodegenEvaluator
+from netlist import UnsettledWarning
+from optimize import optimize
+from simulator import Circuit, GateSpec, Simulator
+from timing import TimingSimulator
+from truthtable import truth_table
+
+FEEDBACK_CIRCUITS = 500
+
+
+def feedback_circuit(seed: int, inputs: int = 3, gates: int = 6, outputs: int = 3) -> Circuit:
+    """A random circuit whose gates may read any gate output, VCC or GND, so loops are common"""
+    rng = random.Random(seed)
+    circuit = Circuit(('VCC',), ('GND',), breadboard=False, ideal_power=True)
+    sources = [('VCC',), ('GND',)]
+    for i in range(inputs):
+        circuit.add_input(f"IN{i+1}", ('switch', f"IN{i+1}"))
+        sources.append(('switch', f"IN{i+1}"))
+    specs = []
+    for g in range(gates):
+        kind = rng.choice(['AND', 'OR', 'NAND', 'NOR', 'NOT'])
+        specs.append(circuit.add_gate(GateSpec(kind, f"{kind}{g+1}")))
+    sources += [gate.output_pos for gate in specs]
+    for gate in specs:
+        for pin_name in ('input1',) if gate.kind == 'NOT' else ('input1', 'input2'):
+            circuit.add_wire(rng.choice(sources), getattr(gate, f"{pin_name}_pos"))
+    for i, gate in enumerate(rng.sample(specs, outputs)):
+        circuit.add_output(f"OUT{i+1}", ('output', f"OUT{i+1}"))
+        circuit.add_wire(gate.output_pos, ('output', f"OUT{i+1}"))
+    return circuit
+
+
+def test_optimized_truth_table_is_unchanged(constant_circuit):
+    optimized, report = optimize(constant_circuit.circuit)
+    assert len(optimized.network.gates) == report.gates_after <= report.gates_before
+    assert truth_table(optimized).columns == truth_table(constant_circuit.circuit).columns
+
+
+def test_optimized_circuit_runs_on_every_backend(constant_circuit):
+    optimized, _ = optimize(constant_circuit.circuit)
+    simulator = Simulator(optimized)
+    evaluator = CodegenEvaluator(optimized)
+    timing = TimingSimulator(optimized, {'AND': 3, 'OR': 4, 'NAND': 2, 'NOR': 2, 'NOT': 1})
+    for inputs in constant_circuit.rows():
+        expected = constant_circuit.reference(inputs)
+        assert simulator.run(inputs) == expected
+        assert evaluator.run(inputs) == expected
+        for name, value in inputs.items():
+            timing.set_input(name, value)
+        assert timing.settle()
+        assert timing.output_values() == expected
+
+
+def test_folds_constants_and_drops_dead_gates():
+    circuit = Circuit(('VCC',), ('GND',), breadboard=False, ideal_power=True)
+    circuit.add_input('IN1', ('switch', 'IN1'))
+    masked = circuit.add_gate(GateSpec('AND', 'AND1'))
+    inverted = circuit.add_gate(GateSpec('NOT', 'NOT1'))
+    unused = circuit.add_gate(GateSpec('OR', 'OR1'))
+    circuit.add_wire(('switch', 'IN1'), masked.input1_pos)
+    circuit.add_wire(('GND',), masked.input2_pos)
+    circuit.add_wire(masked.output_pos, inverted.input1_pos)
+    circuit.add_wire(('switch', 'IN1'), unused.input1_pos)
+    circuit.add_wire(('switch', 'IN1'), unused.input2_pos)
+    circuit.add_output('OUT1', inverted.output_pos)
+    optimized, report = optimize(circuit)
+    assert report.folded == ['AND1=0', 'NOT1=1']
+    assert report.dead == ['OR1']
+    assert optimized.network.gates == []
+    assert Simulator(optimized).run({'IN1': 0}) == {'OUT1': 1}
+
+
+def test_feedback_loops_keep_their_truth_table():
+    cyclic = 0
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UnsettledWarning)  # Ring oscillators are fine here
+        for seed in range(FEEDBACK_CIRCUITS):
+            compiled = feedback_circuit(seed).compile()
+            network = compiled.network
+            if not any(network.is_cyclic(component) for component in network.schedule):
+                continue
+            cyclic += 1
+            optimized, _ = optimize(compiled)
+            assert truth_table(optimized).columns == truth_table(compiled).columns, seed
+    assert cyclic > FEEDBACK_CIRCUITS // 4
+
+
+def test_loop_keeps_the_glitch_it_latched():
+    # NOT1 only glitches high while the loop first settles, but OR2 latches that glitch
+    circuit = Circuit(('VCC',), ('GND',), breadboard=False, ideal_power=True)
+    inverter = circuit.add_gate(GateSpec('NOT', 'NOT1'))
+    latch = circuit.add_gate(GateSpec('OR', 'OR2'))
+    masked = circuit.add_gate(GateSpec('NAND', 'NAND3'))
+    circuit.add_wire(masked.output_pos, inverter.input1_pos)
+    circuit.add_wire(inverter.output_pos, latch.input1_pos)
+    circuit.add_wire(latch.output_pos, latch.input2_pos)
+    circuit.add_wire(('GND',), masked.input1_pos)
+    circuit.add_wire(latch.output_pos, masked.input2_pos)
+    circuit.add_output('OUT1', latch.output_pos)
+    optimized, report = optimize(circuit)
+    assert report.removed == 0
+    assert Simulator(optimized).run() == Simulator(circuit).run() == {'OUT1': 1}
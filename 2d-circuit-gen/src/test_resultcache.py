@@ -0,0 +1,112 @@
+# test_resultcache.py
+import os
+import random
+
+import pytest
+
+from resultcache import ResultCache, cached_sweep_stimulus, cached_truth_table, structural_hash
+from simulator import Circuit, GateSpec
+from truthtable import truth_table
+
+
+def shuffled_copy(circuit: Circuit, seed: int) -> Circuit:
+    """The same circuit with gates renamed and reordered and wires reordered and reversed"""
+    rng = random.Random(seed)
+    renamed = {}
+    copy = Circuit(circuit.vcc_pos, circuit.gnd_pos, circuit.breadboard, circuit.ideal_power)
+    gates = list(circuit.gates)
+    rng.shuffle(gates)
+    for i, gate in enumerate(gates):
+        spec = copy.add_gate(GateSpec(gate.kind, f"G{i}"))
+        for pin_name in ('input1', 'input2', 'output'):
+            if hasattr(gate, f"{pin_name}_pos"):
+                renamed[getattr(gate, f"{pin_name}_pos")] = getattr(spec, f"{pin_name}_pos")
+    wires = [(renamed.get(start, start), renamed.get(end, end)) for start, end in circuit.wires]
+    rng.shuffle(wires)
+    for start, end in wires:
+        copy.add_wire(*((end, start) if rng.random() < 0.5 else (start, end)))
+    for name, point in circuit.inputs.items():
+        copy.add_input(name, point)
+    for name, point in circuit.outputs.items():
+        copy.add_output(name, renamed.get(point, point))
+    return copy
+
+
+def test_hash_ignores_names_and_order(random_circuit):
+    original = structural_hash(random_circuit.circuit)
+    for seed in range(3):
+        assert structural_hash(shuffled_copy(random_circuit.circuit, seed)) == original
+
+
+def test_hash_sees_gate_kind_changes(random_circuit):
+    changed = shuffled_copy(random_circuit.circuit, 0)
+    swap = {'AND': 'NAND', 'NAND': 'AND', 'OR': 'NOR', 'NOR': 'OR'}
+    gate = next((gate for gate in changed.gates if gate.kind in swap), None)
+    if gate is None:
+        pytest.skip("only NOT gates")
+    gate.kind = swap[gate.kind]
+    if truth_table(changed).columns != truth_table(random_circuit.circuit).columns:
+        assert structural_hash(changed) != structural_hash(random_circuit.circuit)
+
+
+def test_cached_results_survive_renaming(random_circuit, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    table = cached_truth_table(random_circuit.circuit, cache, workers=1)
+    assert cache.misses == 1
+    again = cached_truth_table(shuffled_copy(random_circuit.circuit, 1), cache, workers=1)
+    assert cache.hits == 1
+    assert again.columns == table.columns == truth_table(random_circuit.circuit).columns
+
+    rows = [tuple(inputs.values()) for inputs in random_circuit.rows()]
+    first = cached_sweep_stimulus(random_circuit.circuit, rows, cache, workers=1)
+    assert cached_sweep_stimulus(random_circuit.circuit, rows, cache, workers=1) == first
+    assert cache.hits == 2
+
+
+@pytest.mark.parametrize('policy, survivor', [('lru', 'a'), ('fifo', 'b')])
+def test_eviction_policy(tmp_path, policy, survivor):
+    cache = ResultCache(str(tmp_path), max_entries=2, policy=policy)
+    for age, key in enumerate(('a', 'b')):
+        cache.put(key, key)
+        os.utime(cache._file(key), (age, age))
+    assert cache.get('a') == 'a'
+    cache.put('c', 'c')
+    names = sorted(name[:-len('.json')] for name in os.listdir(str(tmp_path)))
+    assert names == sorted([survivor, 'c'])
+
+
+def test_unreadable_entry_is_dropped(tmp_path, capsys):
+    cache = ResultCache(str(tmp_path))
+    with open(cache._file('bad'), 'w') as f:
+        f.write('{')
+    assert cache.get('bad') is None
+    assert not os.path.exists(cache._file('bad'))
+    assert 'Warning' in capsys.readouterr().out
+
+
+def test_unknown_policy(tmp_path):
+    with pytest.raises(ValueError):
+        ResultCache(str(tmp_path), policy='random')
+
+
+def nor_latch(order) -> Circuit:
+    """A cross-coupled NOR latch with its two gates added in the given order"""
+    circuit = Circuit(breadboard=False, ideal_power=True)
+    gates = {name: circuit.add_gate(GateSpec('NOR', name)) for name in order}
+    circuit.add_input('IN1', gates['NOR1'].input1_pos)
+    circuit.add_input('IN2', gates['NOR2'].input1_pos)
+    circuit.add_wire(gates['NOR1'].output_pos, gates['NOR2'].input2_pos)
+    circuit.add_wire(gates['NOR2'].output_pos, gates['NOR1'].input2_pos)
+    circuit.add_output('OUT1', gates['NOR1'].output_pos)
+    circuit.add_output('OUT2', gates['NOR2'].output_pos)
+    return circuit
+
+
+def test_hash_sees_gate_order_within_a_loop(tmp_path):
+    first, second = nor_latch(['NOR1', 'NOR2']), nor_latch(['NOR2', 'NOR1'])
+    assert truth_table(first).columns != truth_table(second).columns
+    assert structural_hash(first) != structural_hash(second)
+    cache = ResultCache(str(tmp_path))
+    assert cached_truth_table(first, cache, workers=1).columns == truth_table(first).columns
+    assert cached_truth_table(second, cache, workers=1).columns == truth_table(second).columns
+    assert cache.hits == 0
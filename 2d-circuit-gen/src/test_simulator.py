@@ -0,0 +1,79 @@
+# test_simulator.py
+import pytest
+
+from simulator import Circuit, GateSpec, Simulator
+
+
+def test_run_matches_reference(random_circuit):
+    simulator = Simulator(random_circuit.circuit)
+    for inputs in random_circuit.rows():
+        assert simulator.run(inputs) == random_circuit.reference(inputs)
+
+
+def test_inputs_persist_between_runs(random_circuit):
+    simulator = Simulator(random_circuit.circuit)
+    rows = list(random_circuit.rows())
+    simulator.run(rows[-1])
+    assert simulator.run() == random_circuit.reference(rows[-1])
+
+
+def test_unknown_input():
+    with pytest.raises(KeyError):
+        Simulator(Circuit()).set_input('IN1', 1)
+
+
+def test_from_board_names_inputs_and_outputs_in_order():
+    gate = GateSpec('NOT', 'NOT1')
+    assert not hasattr(gate, 'input2_pos')
+    circuit = Circuit.from_board([gate], [], [gate.input1_pos], [gate.output_pos], ideal_power=True)
+    assert list(circuit.inputs) == ['IN1']
+    assert Simulator(circuit).run({'IN1': 0}) == {'OUT1': 1}
+
+
+def test_run_levels_matches_reference(random_circuit):
+    simulator = Simulator(random_circuit.circuit)
+    for inputs in random_circuit.rows():
+        expected = {name: str(value) for name, value in random_circuit.reference(inputs).items()}
+        assert simulator.run_levels(inputs) == expected
+        assert simulator.conflicts() == []
+
+
+
+def test_slice_matches_full_circuit(random_circuit):
+    observed = random_circuit.output_names[:1]
+    full = Simulator(random_circuit.circuit)
+    sliced = Simulator(random_circuit.circuit, observe=observed)
+    assert set(sliced.inputs) <= set(full.inputs)
+    for inputs in random_circuit.rows():
+        expected = {name: full.run(inputs)[name] for name in observed}
+        assert sliced.run({name: inputs[name] for name in sliced.inputs}) == expected
+
+
+def test_slice_rejects_unknown_output(random_circuit):
+    with pytest.raises(KeyError):
+        random_circuit.circuit.compile().slice(['NOPE'])
+
+def test_unwired_output_floats():
+    circuit = Circuit(breadboard=False, ideal_power=True)
+    circuit.add_output('OUT1', ('output', 'OUT1'))
+    assert Simulator(circuit).run_levels() == {'OUT1': 'Z'}
+
+
+def test_wired_outputs_contend():
+    circuit = Circuit(breadboard=False, ideal_power=True)
+    high = circuit.add_gate(GateSpec('NOT', 'NOT1'))
+    low = circuit.add_gate(GateSpec('NOT', 'NOT2'))
+    circuit.add_input('IN1', ('switch', 'IN1'))
+    circuit.add_input('IN2', ('switch', 'IN2'))
+    circuit.add_wire(('switch', 'IN1'), high.input1_pos)
+    circuit.add_wire(('switch', 'IN2'), low.input1_pos)
+    circuit.add_wire(high.output_pos, low.output_pos)
+    circuit.add_output('OUT1', high.output_pos)
+    simulator = Simulator(circuit)
+    assert simulator.run_levels({'IN1': 0, 'IN2': 1}) == {'OUT1': 'X'}
+    [conflict] = simulator.conflicts()
+    assert conflict.kind == 'contention'
+    assert sorted(conflict.gates) == [0, 1]
+    # Tied gate outputs are flagged even while they happen to agree
+    assert simulator.run_levels({'IN1': 1, 'IN2': 1}) == {'OUT1': '0'}
+    assert [conflict.kind for conflict in simulator.conflicts()] == ['contention']
@@ -0,0 +1,66 @@
+# test_snap.py
+import random
+
+import pytest
+
+pytest.importorskip('pygame')
+
+from geometry import CELL_PITCH, HOLE_POS
+from snap import KDTree, nearest_hole, snap_pins
+
+RANDOM_POINTS = 20000
+
+
+def brute_force(pos):
+    """(squared distance, hole ID) of the nearest hole from a scan of every hole, lowest ID on ties"""
+    x, y = pos
+    distances = [(hole_x - x) * (hole_x - x) + (hole_y - y) * (hole_y - y) for hole_x, hole_y in HOLE_POS]
+    distance = min(distances)
+    return distance, distances.index(distance)
+
+
+def test_nearest_hole_matches_brute_force():
+    rng = random.Random(0)
+    xs = [x for x, _ in HOLE_POS]
+    ys = [y for _, y in HOLE_POS]
+    # Cover the board, a margin around it, and exact hole and midpoint positions where ties happen
+    x_range = (min(xs) - 60, max(xs) + 60)
+    y_range = (min(ys) - 60, max(ys) + 60)
+    for i in range(RANDOM_POINTS):
+        if i % 4 == 0:
+            hole = rng.choice(HOLE_POS)
+            pos = (hole[0] + rng.choice([-1, 0, 1]) * CELL_PITCH // 2,
+                   hole[1] + rng.choice([-1, 0, 1]) * CELL_PITCH // 2)
+        else:
+            pos = (rng.randint(*x_range), rng.randint(*y_range))
+        assert nearest_hole(pos) == HOLE_POS[brute_force(pos)[1]], pos
+
+
+def test_kd_tree_matches_brute_force():
+    rng = random.Random(1)
+    hole_ids = rng.sample(range(len(HOLE_POS)), 200)
+    tree = KDTree(hole_ids)
+    for _ in range(2000):
+        pos = (rng.randint(0, 1600), rng.randint(0, 800))
+        expected = min(((HOLE_POS[hole_id][0] - pos[0]) ** 2 + (HOLE_POS[hole_id][1] - pos[1]) ** 2, hole_id)
+                       for hole_id in hole_ids)
+        assert tree.nearest(pos) == expected
+
+
+class Pins:
+    """A stand-in gate with a pin off to each side"""
+
+    def __init__(self, x: int, y: int):
+        self.vcc_pos = (x - 40, y)
+        self.output_pos = (x + 20, y)
+        self.gnd_pos = (x + 40, y)
+
+
+def test_snap_pins_matches_brute_force():
+    rng = random.Random(2)
+    for _ in range(500):
+        component = Pins(rng.randint(0, 1600), rng.randint(0, 800))
+        expected = {name: HOLE_POS[brute_force(getattr(component, f"{name}_pos"))[1]]
+                    for name in ('vcc', 'output', 'gnd')}
+        assert snap_pins(component) == expected
+        assert snap_pins(component, ['gnd']) == {'gnd': expected['gnd']}
@@ -0,0 +1,45 @@
+# test_sweep.py
+import pytest
+
+from sweep import read_stimulus, sweep_stimulus, sweep_truth_table
+from truthtable import truth_table
+
+
+def test_sweep_truth_table_matches_truth_table(random_circuit):
+    expected = truth_table(random_circuit.circuit).columns
+    assert sweep_truth_table(random_circuit.circuit, workers=1).columns == expected
+
+
+def test_sweep_stimulus_matches_reference(random_circuit):
+    rows = [tuple(inputs.values()) for inputs in random_circuit.rows()]
+    results = sweep_stimulus(random_circuit.circuit, rows, workers=1, chunk_size=5)
+    assert results == [tuple(random_circuit.reference(inputs).values()) for inputs in random_circuit.rows()]
+
+
+def test_process_pool_matches_single_worker(random_circuit):
+    compiled = random_circuit.circuit.compile()
+    assert sweep_truth_table(compiled, workers=2).columns == sweep_truth_table(compiled, workers=1).columns
+    rows = [tuple(inputs.values()) for inputs in random_circuit.rows()]
+    assert sweep_stimulus(compiled, rows, workers=2) == sweep_stimulus(compiled, rows, workers=1)
+
+
+def test_read_stimulus_accepts_packed_and_separated_rows(tmp_path):
+    path = tmp_path / 'stimulus.txt'
+    path.write_text("# IN1 IN2 IN3\n010\n\n1, 0, 1\n1 1 0\n")
+    assert read_stimulus(str(path), 3) == [(0, 1, 0), (1, 0, 1), (1, 1, 0)]
+
+
+@pytest.mark.parametrize('row', ['012', '1 x 0', '1, 10, 0'])
+def test_read_stimulus_rejects_values_other_than_0_and_1(tmp_path, row):
+    path = tmp_path / 'stimulus.txt'
+    path.write_text(f"000\n{row}\n")
+    with pytest.raises(ValueError, match='line 2'):
+        read_stimulus(str(path), 3)
+
+
+def test_read_stimulus_checks_row_length(tmp_path):
+    path = tmp_path / 'stimulus.txt'
+    path.write_text("# comment\n000\n00\n")
+    assert read_stimulus(str(path)) == [(0, 0, 0), (0, 0)]
+    with pytest.raises(ValueError, match='line 3: expected 3 values, got 2'):
+        read_stimulus(str(path), 3)
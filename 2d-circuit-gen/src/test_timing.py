@@ -0,0 +1,65 @@
+# test_timing.py
+import random
+
+import pytest
+
+from simulator import Circuit, GateSpec
+from timing import PART_DELAYS_NS, TimingSimulator, load_gate_delays
+
+DELAYS = {'AND': 12, 'OR': 14, 'NAND': 10, 'NOR': 10, 'NOT': 10}
+
+
+def test_settled_outputs_match_reference(random_circuit):
+    rng = random.Random(len(random_circuit.gates))
+    simulator = TimingSimulator(random_circuit.circuit, {kind: rng.randint(1, 20) for kind in DELAYS})
+    assert simulator.settle()
+    for inputs in random_circuit.rows():
+        for name, value in inputs.items():
+            simulator.set_input(name, value)
+        assert simulator.settle()
+        assert simulator.output_values() == random_circuit.reference(inputs)
+
+
+def test_inverter_chain_delay():
+    circuit = Circuit(breadboard=False, ideal_power=True)
+    circuit.add_input('IN1', ('switch', 'IN1'))
+    previous = ('switch', 'IN1')
+    for i in range(3):
+        gate = circuit.add_gate(GateSpec('NOT', f"NOT{i+1}"))
+        circuit.add_wire(previous, gate.input1_pos)
+        previous = gate.output_pos
+    circuit.add_output('OUT1', previous)
+    simulator = TimingSimulator(circuit, DELAYS)
+    simulator.settle()
+    assert simulator.output_values() == {'OUT1': 1}
+    start = simulator.time
+    simulator.set_input('IN1', 1)
+    simulator.run(29)
+    assert simulator.output_values() == {'OUT1': 1}
+    simulator.run(1)
+    assert simulator.time == start + 30
+    assert simulator.output_values() == {'OUT1': 0}
+
+
+def test_missing_components_file_uses_part_delays(tmp_path):
+    with pytest.warns(UserWarning, match='default gate delays'):
+        delays = load_gate_delays(str(tmp_path / 'missing.json'))
+    assert delays['NAND'] == PART_DELAYS_NS['7400']
+
+
+def test_malformed_components_file_uses_part_delays(tmp_path):
+    path = tmp_path / 'components.json'
+    path.write_text('[{"code": "NAND", "ic_details": {"propagation_delay_ns": "fast"}}]')
+    with pytest.warns(UserWarning, match='default gate delays'):
+        assert load_gate_delays(str(path))['NAND'] == PART_DELAYS_NS['7400']
+
+
+def test_set_input_rejects_past_times():
+    circuit = Circuit(breadboard=False, ideal_power=True)
+    circuit.add_input('IN1', ('switch', 'IN1'))
+    simulator = TimingSimulator(circuit, DELAYS)
+    simulator.run(50)
+    simulator.set_input('IN1', 1, at=50)
+    simulator.set_input('IN1', 0, at=60)
+    with pytest.raises(ValueError):
+        simulator.set_input('IN1', 1, at=49)
@@ -0,0 +1,12 @@
+# test_truthtable.py
+from simulator import Simulator
+from truthtable import truth_table
+
+
+def test_truth_table_matches_simulator(random_circuit):
+    table = truth_table(random_circuit.circuit)
+    simulator = Simulator(random_circuit.circuit)
+    assert table.input_names == random_circuit.input_names
+    for (inputs, outputs), assignment in zip(table, random_circuit.rows()):
+        assert inputs == tuple(assignment.values())
+        assert outputs == tuple(simulator.run(assignment).values())
@@ -0,0 +1,49 @@
+# test_vcd.py
+import pytest
+
+from simulator import Circuit, GateSpec
+from timing import TimingSimulator
+from vcd import VCDWriter, _identifier, watch_timing
+
+
+def test_identifiers_are_unique():
+    identifiers = [_identifier(i) for i in range(20000)]
+    assert len(set(identifiers)) == len(identifiers)
+    assert all(33 <= ord(char) <= 126 for identifier in identifiers for char in identifier)
+
+
+def test_only_changes_are_written(tmp_path):
+    path = str(tmp_path / 'run.vcd')
+    with VCDWriter(path, ['A', 'B']) as writer:
+        writer.sample(0, {'A': 0, 'B': 1})
+        writer.change(5, 'A', 0)
+        writer.change(7, 'A', 1)
+    body = open(path).read().split("$enddefinitions $end\n")[1]
+    assert body == "#0\n0!\n1\"\n#7\n1!\n"
+
+
+def test_levels_write_x_and_z(tmp_path):
+    path = str(tmp_path / 'levels.vcd')
+    with VCDWriter(path, ['OUT1']) as writer:
+        for time, level in enumerate(['Z', 'Z', 'X', '1', '0', 'z', 0]):
+            writer.change(time, 'OUT1', level)
+        with pytest.raises(ValueError):
+            writer.change(9, 'OUT1', 'H')
+    body = open(path).read().split("$enddefinitions $end\n")[1]
+    assert body == "#0\nz!\n#2\nx!\n#3\n1!\n#4\n0!\n#5\nz!\n#6\n0!\n"
+
+
+def test_timing_changes_land_after_the_gate_delay(tmp_path):
+    circuit = Circuit(breadboard=False, ideal_power=True)
+    gate = circuit.add_gate(GateSpec('NOT', 'NOT1'))
+    circuit.add_input('IN1', gate.input1_pos)
+    circuit.add_output('OUT1', gate.output_pos)
+    simulator = TimingSimulator(circuit, {'NOT': 10})
+    simulator.settle(100)
+    path = str(tmp_path / 'timing.vcd')
+    with VCDWriter(path, ['IN1', 'OUT1']) as writer:
+        watch_timing(simulator, writer)
+        simulator.set_input('IN1', 1)
+        simulator.run(50)
+    body = open(path).read().split("$enddefinitions $end\n")[1]
+    assert body == "#100\n0!\n1\"\n1!\n#110\n0\"\n"
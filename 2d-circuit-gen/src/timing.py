@@ -0,0 +1,190 @@
+# timing.py
+import heapq
+import json
+import os
+import warnings
+from typing import Callable, Dict, List, Mapping, Optional, Set, Union
+
+from netlist import GATE_LOGIC
+from simulator import Circuit, CompiledCircuit
+
+# Event-driven timing simulation. Every gate has a propagation delay; a
+# change on a net wakes only the gates reading it, and their new outputs are
+# queued on a heap to land delay nanoseconds later. Glitches, races and ring
+# oscillators show up as they would on the bench.
+
+# Typical 74LS propagation delays in ns, keyed by part number
+PART_DELAYS_NS = {
+    '7400': 10,  # NAND
+    '7402': 10,  # NOR
+    '7404': 10,  # NOT
+    '7408': 12,  # AND
+    '7432': 14,  # OR
+}
+
+# Part used for each gate kind when the components file does not say
+GATE_PARTS = {'NAND': '7400', 'NOR': '7402', 'NOT': '7404', 'AND': '7408', 'OR': '7432'}
+
+COMPONENTS_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               '..', '..', 'circuitCommandGen', 'data', 'components.json')
+
+# Event kinds; sources sort before gates at the same timestamp
+SOURCE_EVENT = 0
+GATE_EVENT = 1
+
+
+def load_gate_delays(path: str = COMPONENTS_JSON) -> Dict[str, int]:
+    """Delay per gate kind, seeded from the part numbers in components.json.
+
+    An ic_details entry may give its own 'propagation_delay_ns'; otherwise
+    the typical value for the part number is used.
+    """
+    delays = {kind: PART_DELAYS_NS[part] for kind, part in GATE_PARTS.items()}
+    try:
+        with open(path, 'r') as f:
+            components = json.load(f)
+        for component in components:
+            ic_details = component.get('ic_details', {})
+            kind = component.get('code')
+            if kind not in GATE_LOGIC:
+                continue
+            if 'propagation_delay_ns' in ic_details:
+                delays[kind] = int(ic_details['propagation_delay_ns'])
+            elif ic_details.get('part_number') in PART_DELAYS_NS:
+                delays[kind] = PART_DELAYS_NS[ic_details['part_number']]
+    except (OSError, ValueError, KeyError) as e:
+        warnings.warn(f"using default gate delays ({e})", stacklevel=2)
+    return delays
+
+
+class TimingSimulator:
+    """Discrete-event simulation of a compiled circuit with per-kind gate delays.
+
+    Time is in integer nanoseconds. Input changes are events too, so stimulus
+    can be scheduled ahead with set_input(..., at=t).
+    """
+
+    def __init__(self, circuit: Union[Circuit, CompiledCircuit],
+                 delays: Optional[Mapping[str, int]] = None):
+        self.compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile()
+        self.delays = dict(delays) if delays is not None else load_gate_delays()
+        network = self.compiled.network
+        self.gates = network.gates
+        self.drivers = network.drivers
+        self.readers: Dict[int, List[int]] = {}
+        for gate_index, gate in enumerate(self.gates):
+            reads = set(gate.inputs)
+            if gate.power is not None:
+                reads.add(gate.power)
+            for net in reads:
+                self.readers.setdefault(net, []).append(gate_index)
+        self.gate_delays = [max(1, int(self.delays.get(gate.kind, 10))) for gate in self.gates]
+        self.listeners: List[Callable[[int, int, int], None]] = []  # (time, net, value) on change
+        self.reset()
+
+    def reset(self):
+        """Time zero: inputs low, every gate output low and about to be evaluated"""
+        self.time = 0
+        self.events_processed = 0
+        self.queue: List[tuple] = []
+        self._sequence = 0
+        self.outputs = [0] * len(self.gates)
+        self.projected = [0] * len(self.gates)  # Last value scheduled per gate
+        self.sources: Dict[int, int] = {}
+        self.source_inputs: Dict[int, Dict[str, int]] = {}
+        if self.compiled.vcc_net is not None:
+            self.sources[self.compiled.vcc_net] = 1
+        for net in self.compiled.tied_high:
+            self.sources[net] = 1
+        self.values: Dict[int, int] = dict(self.sources)
+        self._evaluate(range(len(self.gates)))
+
+    # Stimulus
+
+    def set_input(self, name: str, value: int, at: Optional[int] = None):
+        """Drive an input to value now, or at absolute time at (not in the past)"""
+        if name not in self.compiled.input_nets:
+            raise KeyError(f"Unknown input '{name}'")
+        if at is None:
+            at = self.time
+        elif at < self.time:
+            raise ValueError(f"Cannot schedule input '{name}' at {at} ns, before the current time {self.time} ns")
+        self._push(at, SOURCE_EVENT, name, 1 if value else 0)
+
+    # Running
+
+    def run_until(self, end_time: int) -> int:
+        """Process every event up to and including end_time; returns events processed"""
+        processed = self.events_processed
+        while self.queue and self.queue[0][0] <= end_time:
+            self._step()
+        self.time = max(self.time, end_time)
+        return self.events_processed - processed
+
+    def run(self, duration: int) -> int:
+        return self.run_until(self.time + duration)
+
+    def settle(self, limit: int = 1_000_000) -> bool:
+        """Run until no events are pending; False if still busy after limit ns"""
+        self.run_until(self.time + limit)
+        return not self.queue
+
+    def output_values(self) -> Dict[str, int]:
+        return {name: self.values.get(net, 0) for name, net in self.compiled.output_nets.items()}
+
+    # Event processing
+
+    def _push(self, time: int, kind: int, target, value: int):
+        heapq.heappush(self.queue, (time, kind, self._sequence, target, value))
+        self._sequence += 1
+
+    def _step(self):
+        """Apply every event of the earliest timestamp, then evaluate the woken gates"""
+        queue = self.queue
+        self.time = queue[0][0]
+        touched: Set[int] = set()
+        while queue and queue[0][0] == self.time:
+            _, kind, _, target, value = heapq.heappop(queue)
+            self.events_processed += 1
+            if kind == SOURCE_EVENT:
+                net = self.compiled.input_nets[target]
+                if net is None:
+                    continue
+                self.source_inputs.setdefault(net, {})[target] = value
+                drive = 1 if any(self.source_inputs[net].values()) else 0
+                if net == self.compiled.vcc_net or net in self.compiled.tied_high:
+                    drive = 1
+                self.sources[net] = drive
+                touched.add(net)
+            elif self.outputs[target] != value:
+                self.outputs[target] = value
+                touched.add(self.gates[target].output)
+
+        woken: Set[int] = set()
+        for net in touched:
+            value = self.sources.get(net, 0)
+            for driver in self.drivers.get(net, ()):
+                value |= self.outputs[driver]
+            if value != self.values.get(net, 0):
+                self._set_net(net, value)
+                woken.update(self.readers.get(net, ()))
+        self._evaluate(sorted(woken))
+
+    def _set_net(self, net: int, value: int):
+        self.values[net] = value
+        for listener in self.listeners:
+            listener(self.time, net, value)
+
+    def _evaluate(self, gate_indices):
+        values = self.values
+        for gate_index in gate_indices:
+            gate = self.gates[gate_index]
+            if not gate.grounded:
+                result = 0
+            else:
+                result = GATE_LOGIC[gate.kind](*[values.get(net, 0) for net in gate.inputs], 1)
+                if gate.power is not None:
+                    result &= values.get(gate.power, 0)
+            if result != self.projected[gate_index]:
+                self.projected[gate_index] = result
+                self._push(self.time + self.gate_delays[gate_index], GATE_EVENT, gate_index, result)
@@ -0,0 +1,88 @@
+# truthtable.py
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from simulator import Circuit, CompiledCircuit
+
+# Every input assignment is one bit position of a Python int, so one
+# evaluation of the gate network fills in the whole table: AND/OR/NAND/NOR/NOT
+# become bitwise ops over words that are 2**n bits wide.
+
+
+def input_word(position: int, rows: int) -> int:
+    """Bit pattern of the input whose value in row r is bit `position` of r.
+
+    The pattern is runs of 2**position zeros then ones, built by doubling
+    instead of looping over rows.
+    """
+    run = 1 << position
+    word = ((1 << run) - 1) << run
+    width = run * 2
+    while width < rows:
+        word |= word << width
+        width *= 2
+    return word & ((1 << rows) - 1)
+
+
+class TruthTable:
+    """Packed truth table: one int per signal, bit r holds row r.
+
+    Rows count up with the first input as the most significant bit, the
+    order a truth table is normally written in.
+    """
+
+    def __init__(self, input_names: List[str], output_names: List[str], columns: Dict[str, int]):
+        self.input_names = input_names
+        self.output_names = output_names
+        self.columns = columns
+        self.rows = 1 << len(input_names)
+
+    def column(self, name: str) -> int:
+        return self.columns[name]
+
+    def row(self, index: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """(input values, output values) of one row"""
+        return (tuple((self.columns[name] >> index) & 1 for name in self.input_names),
+                tuple((self.columns[name] >> index) & 1 for name in self.output_names))
+
+    def __iter__(self) -> Iterator[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+        for index in range(self.rows):
+            yield self.row(index)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def format(self, max_rows: Optional[int] = 64) -> str:
+        """Printable table, cut off after max_rows rows"""
+        lines = [" ".join(self.input_names) + " | " + " ".join(self.output_names)]
+        for index, (inputs, outputs) in enumerate(self):
+            if max_rows is not None and index >= max_rows:
+                lines.append(f"... {self.rows - max_rows} more rows")
+                break
+            cells = [str(value).rjust(len(name)) for name, value in zip(self.input_names, inputs)]
+            cells.append("|")
+            cells += [str(value).rjust(len(name)) for name, value in zip(self.output_names, outputs)]
+            lines.append(" ".join(cells))
+        return "\n".join(lines)
+
+
+def truth_table(circuit: Union[Circuit, CompiledCircuit],
+                observe: Optional[Iterable[str]] = None) -> TruthTable:
+    """Evaluate every input assignment of the circuit in one bit-parallel pass.
+
+    With observe, the table covers only those outputs and the inputs in
+    their cone of influence, so unrelated inputs do not double its size.
+    """
+    compiled = circuit if isinstance(circuit, CompiledCircuit) else circuit.compile()
+    if observe is not None:
+        compiled = compiled.slice(observe)
+    input_names = list(compiled.input_nets)
+    output_names = list(compiled.output_nets)
+    rows = 1 << len(input_names)
+    ones = (1 << rows) - 1
+
+    count = len(input_names)
+    columns = {name: input_word(count - 1 - i, rows) for i, name in enumerate(input_names)}
+    values = compiled.evaluate(columns, ones)
+    for name, net in compiled.output_nets.items():
+        columns[name] = values.get(net, 0) & ones
+    return TruthTable(input_names, output_names, columns)
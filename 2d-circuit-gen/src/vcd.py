@@ -0,0 +1,104 @@
+# vcd.py
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+# Value Change Dump writer. Only changes are written, through a buffered
+# append-only file, so memory stays flat however long the run is.
+
+BUFFER_SIZE = 1 << 16  # Bytes buffered before a write reaches the disk
+
+
+def _identifier(index: int) -> str:
+    """Short VCD identifier from the printable range '!'..'~'"""
+    chars = []
+    while True:
+        index, digit = divmod(index, 94)
+        chars.append(chr(33 + digit))
+        if index == 0:
+            return "".join(chars)
+        index -= 1
+
+
+def _value(value: Union[int, str]) -> str:
+    """VCD scalar for a level ('0', '1', 'X' or 'Z' in either case) or a boolean value"""
+    if isinstance(value, str):
+        level = value.lower()
+        if level not in ('0', '1', 'x', 'z'):
+            raise ValueError(f"Not a logic level: {value!r}")
+        return level
+    return '1' if value else '0'
+
+
+class VCDWriter:
+    """Streams 1-bit signal changes, including x and z, to a .vcd file"""
+
+    def __init__(self, path: str, signals: Sequence[str], timescale: str = '1ns',
+                 scope: str = 'circuit'):
+        self.path = path
+        self.signals = list(signals)
+        self.ids: Dict[str, str] = {name: _identifier(i) for i, name in enumerate(self.signals)}
+        self.last: Dict[str, Optional[str]] = {name: None for name in self.signals}
+        self.time: Optional[int] = None
+        self.file = open(path, 'w', buffering=BUFFER_SIZE)
+        self.file.write(f"$timescale {timescale} $end\n$scope module {scope} $end\n")
+        for name in self.signals:
+            self.file.write(f"$var wire 1 {self.ids[name]} {name.replace(' ', '_')} $end\n")
+        self.file.write("$upscope $end\n$enddefinitions $end\n")
+
+    def change(self, time: int, name: str, value: Union[int, str]):
+        """Record a signal value or level at time; repeated values are dropped"""
+        value = _value(value)
+        if name not in self.ids or self.last[name] == value:
+            return
+        self.last[name] = value
+        if time != self.time:
+            self.file.write(f"#{time}\n")
+            self.time = time
+        self.file.write(f"{value}{self.ids[name]}\n")
+
+    def sample(self, time: int, values: Dict[str, Union[int, str]]):
+        """Record several signals at one time"""
+        for name, value in values.items():
+            self.change(time, name, value)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def watch_timing(simulator, writer: VCDWriter, nets: Optional[Dict[str, int]] = None):
+    """Stream a TimingSimulator's inputs, outputs and extra named nets to writer"""
+    compiled = simulator.compiled
+    names: Dict[int, List[str]] = {}
+    watched = dict(compiled.input_nets)
+    watched.update(compiled.output_nets)
+    watched.update(nets or {})
+    for name, net in watched.items():
+        if net is not None:
+            names.setdefault(net, []).append(name)
+    for net, signal_names in names.items():
+        for name in signal_names:
+            writer.change(simulator.time, name, simulator.values.get(net, 0))
+
+    def on_change(time: int, net: int, value: int):
+        for name in names.get(net, ()):
+            writer.change(time, name, value)
+
+    simulator.listeners.append(on_change)
+    return on_change
+
+
+def write_vectors(path: str, input_names: Sequence[str], output_names: Sequence[str],
+                  inputs: Iterable[Sequence[int]], outputs: Iterable[Sequence[int]]):
+    """Dump a headless batch run, one time step per vector"""
+    with VCDWriter(path, list(input_names) + list(output_names), timescale='1ns') as writer:
+        for time, (in_row, out_row) in enumerate(zip(inputs, outputs)):
+            for name, value in zip(input_names, in_row):
+                writer.change(time, name, value)
+            for name, value in zip(output_names, out_row):
+                writer.change(time, name, value)